@@ -0,0 +1,145 @@
+"""
+batch markup for many sudoku puzzles at once, using numpy
+
+grids are (N, 9, 9) int arrays of givens (0 for blank).
+Candidates are an (N, 9, 9, 9) bool array, where cands[n, row, col, d]
+is True if number d+1 could go in that cell, or (with packed=True)
+an (N, 9, 9) uint16 array using the same bit layout as bitset.py.
+
+Bigger boards work too: the size (16, 25, ...) comes from the shape
+of the grids, and packed masks get a wider type (see bitset.py).
+
+Oct 2026
+"""
+
+import numpy as np
+from bitset import maskdtype
+from units import orderof
+
+
+def _weights(size):
+    """bit for each number, as an array of masks"""
+    return (1 << np.arange(size, dtype=np.uint64)).astype(maskdtype(size))
+
+
+def _order(arr):
+    """board order from an (N, size, size, ...) array"""
+    order = orderof(arr.shape[1])
+    if not order:
+        raise ValueError("not a sudoku board size: %d" % arr.shape[1])
+    return order
+
+
+def _boxview(arr):
+    """view an (N, 9, 9, ...) array as (N, boxrow, row, boxcol, col, ...)"""
+    k = _order(arr)
+    return arr.reshape((arr.shape[0], k, k, k, k) + arr.shape[3:])
+
+
+def _expandboxes(boxarr):
+    """turn an (N, 3, 3, ...) per-box array into (N, 9, 9, ...)"""
+    k = boxarr.shape[1]
+    return boxarr.repeat(k, axis=1).repeat(k, axis=2)
+
+
+def candidates(grids, packed=False):
+    """return the markup (all candidates) for every grid"""
+    grids = np.asarray(grids)
+    numbers = np.arange(1, grids.shape[-1] + 1)
+    placed = grids[..., None] == numbers             # (N, 9, 9, 9)
+    rowused = placed.any(axis=2)                     # (N, row, num)
+    colused = placed.any(axis=1)                     # (N, col, num)
+    boxused = _boxview(placed).any(axis=(2, 4))      # (N, 3, 3, num)
+    used = rowused[:, :, None, :] | colused[:, None, :, :] \
+        | _expandboxes(boxused)
+    cands = ~used & (grids == 0)[..., None]
+    if packed:
+        return pack(cands)
+    return cands
+
+
+def pack(cands):
+    """pack (N, 9, 9, 9) bool candidates into (N, 9, 9) uint16 masks"""
+    size = cands.shape[-1]
+    return (cands * _weights(size)).sum(axis=-1, dtype=maskdtype(size))
+
+
+def unpack(masks):
+    """unpack (N, 9, 9) uint16 masks into (N, 9, 9, 9) bool candidates"""
+    masks = np.asarray(masks)
+    return (masks[..., None] & _weights(masks.shape[-1])) != 0
+
+
+def singles(cands):
+    """(N, 9, 9) array of numbers for cells with only one candidate"""
+    single = cands.sum(axis=-1) == 1
+    return np.where(single, cands.argmax(axis=-1) + 1, 0)
+
+
+def forced(cands):
+    """(N, 9, 9) array of forced numbers (0 where nothing is forced)
+
+    A number is forced when it has only one possible cell in a row,
+    col, or box (findforced only checks boxes).
+    """
+    once = (cands.sum(axis=2, keepdims=True) == 1) \
+        | (cands.sum(axis=1, keepdims=True) == 1) \
+        | _expandboxes(_boxview(cands).sum(axis=(2, 4)) == 1)
+    hits = cands & once
+    return np.where(hits.any(axis=-1), hits.argmax(axis=-1) + 1, 0)
+
+
+def fill(grids, maxpasses=81):
+    """fill in singletons and forced numbers until nothing changes
+
+    returns the new grids and the final candidates
+    """
+    grids = np.array(grids)
+    for _ in range(maxpasses):
+        cands = candidates(grids)
+        found = singles(cands)
+        found = np.where(found > 0, found, forced(cands))
+        if not found.any():
+            break
+        grids = np.where(grids == 0, found, grids)
+    else:
+        cands = candidates(grids)
+    return grids, cands
+
+
+def main():
+    """minimal tests for the batch markup functions"""
+    import puzzle
+    shortz = np.array([[0, 3, 9, 5, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 8, 0, 0, 0, 7, 0],
+                       [0, 0, 0, 0, 1, 0, 9, 0, 4],
+                       [1, 0, 0, 4, 0, 0, 0, 0, 3],
+                       [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 7, 0, 0, 0, 8, 6, 0],
+                       [0, 0, 6, 7, 0, 8, 2, 0, 0],
+                       [0, 1, 0, 0, 9, 0, 0, 0, 5],
+                       [0, 0, 0, 0, 0, 1, 0, 0, 8]])
+    grids = np.stack([shortz, shortz.T])
+    masks = candidates(grids, packed=True)
+    print("candidate masks, first row:", masks[0, 0])
+    assert (unpack(masks) == candidates(grids)).all()
+    # same answer as the one-at-a-time markup
+    puzz = puzzle.Puzzle()
+    puzz.setnums(shortz)
+    puzz.mark()
+    assert [m.getmask() for m in puzz.markups] == masks[0].ravel().tolist()
+    assert (masks[1] == masks[0].T).all()
+    print("forced:\n", forced(candidates(grids))[0])
+    filled, cands = fill(grids)
+    print("filled:\n", filled[0])
+    # and a 4x4 board
+    small = np.array([[[1, 0, 0, 4], [0, 0, 1, 0],
+                       [2, 1, 0, 0], [4, 0, 0, 1]]])
+    filled, cands = fill(small)
+    assert filled.all() and not cands.any()
+    print("4x4:\n", filled[0])
+    print("all ok")
+
+
+if __name__ == "__main__":
+    main()
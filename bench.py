@@ -0,0 +1,153 @@
+"""
+benchmark the solver on the graded puzzles in corpus/
+
+Buckets (one file each, same format as puzzleio.py):
+    forced  - findforced and singletons solve them (like easy)
+    pss     - needs preemptive sets, but no search (like shortz)
+    stall   - the preemptive sets get stuck, so search is needed
+              (like diabolical and beach)
+
+For each bucket, reports puzzles/second, p50/p95/p99 latency, and
+the total time spent in findforced, mark, propagate, findpss,
+filtermarkups, and search (see Puzzle.phases).  Results go to a JSON
+file, and can be compared to a saved baseline to flag anything that
+got slower.
+
+    python3 bench.py                         # run, print, save JSON
+    python3 bench.py --baseline old.json     # ...and compare
+
+Oct 2026
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import puzzle
+import puzzleio
+
+CORPUSDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+BUCKETS = ["forced", "pss", "stall"]
+PHASES = ["findforced", "mark", "propagate", "findpss", "filtermarkups",
+          "search"]
+
+
+def timedsolve(nums, phases):
+    """Puzzle.solve, adding the time for each step to phases"""
+    puzz = puzzle.Puzzle()
+    puzz.setnums(nums)
+    puzz.phases = phases
+    return puzz.solve()
+
+
+def percentile(times, pct):
+    """pct-th percentile of a sorted list"""
+    if not times:
+        return 0.0
+    j = min(len(times) - 1, int(round(pct / 100 * (len(times) - 1))))
+    return times[j]
+
+
+def runbucket(path, repeat=1):
+    """time every puzzle in one corpus file, return dict of results"""
+    with open(path) as infile:
+        puzzles = [nums for nums in puzzleio.readpuzzles(infile)
+                   if nums is not None]
+    phases = dict.fromkeys(PHASES, 0.0)
+    statuses = {}
+    times = []
+    for _ in range(repeat):
+        for nums in puzzles:
+            start = time.perf_counter()
+            status = timedsolve(nums, phases)
+            times.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    times.sort()
+    total = sum(times)
+    return {"puzzles": len(times),
+            "statuses": statuses,
+            "throughput": len(times) / total if total else 0.0,
+            "p50": percentile(times, 50),
+            "p95": percentile(times, 95),
+            "p99": percentile(times, 99),
+            "phases": phases}
+
+
+def compare(results, baseline, tolerance):
+    """list of regressions: latency/throughput worse than baseline by
+    more than tolerance (a fraction)"""
+    regressions = []
+    for bucket, res in results["buckets"].items():
+        old = baseline.get("buckets", {}).get(bucket)
+        if old is None:
+            continue
+        for key in ("p50", "p95", "p99"):
+            if old[key] and res[key] > old[key] * (1 + tolerance):
+                regressions.append("%s %s: %.3fms -> %.3fms"
+                                   % (bucket, key, old[key]*1000,
+                                      res[key]*1000))
+        if res["throughput"] < old["throughput"] * (1 - tolerance):
+            regressions.append("%s throughput: %.1f/s -> %.1f/s"
+                               % (bucket, old["throughput"],
+                                  res["throughput"]))
+    return regressions
+
+
+def report(results):
+    """pretty-print the results"""
+    print("%-8s %7s %10s %9s %9s %9s" % ("bucket", "puzzles", "puzzles/s",
+                                          "p50 ms", "p95 ms", "p99 ms"))
+    for bucket, res in results["buckets"].items():
+        print("%-8s %7d %10.1f %9.3f %9.3f %9.3f"
+              % (bucket, res["puzzles"], res["throughput"], res["p50"]*1000,
+                 res["p95"]*1000, res["p99"]*1000))
+    print()
+    print("%-8s" % "seconds" + "".join("%14s" % p for p in PHASES))
+    for bucket, res in results["buckets"].items():
+        print("%-8s" % bucket
+              + "".join("%14.4f" % res["phases"][p] for p in PHASES))
+
+
+def main():
+    """run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--corpus", default=CORPUSDIR,
+                        help="directory with forced.txt, pss.txt, stall.txt")
+    parser.add_argument("--buckets", nargs="+", default=BUCKETS)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="times to solve each puzzle")
+    parser.add_argument("--output", default="bench_output.json",
+                        help="where to write the JSON results")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed slowdown vs baseline (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    results = {"python": platform.python_version(),
+               "machine": platform.machine(),
+               "repeat": args.repeat,
+               "buckets": {}}
+    for bucket in args.buckets:
+        path = os.path.join(args.corpus, bucket + ".txt")
+        results["buckets"][bucket] = runbucket(path, args.repeat)
+    report(results)
+    with open(args.output, "w") as outfile:
+        json.dump(results, outfile, indent=2)
+    print("\nwrote", args.output)
+    if args.baseline:
+        with open(args.baseline) as infile:
+            baseline = json.load(infile)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESSIONS vs %s:" % args.baseline)
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print("no regressions vs", args.baseline)
+
+
+if __name__ == "__main__":
+    main()
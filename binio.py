@@ -0,0 +1,388 @@
+"""
+binary puzzle files: a header, then one fixed-size record per puzzle
+
+Reading text is slow next to solving, so a big corpus can be turned
+into this format once, and then memory-mapped: nothing is parsed, any
+puzzle can be read by its index, and a slice of the file is an
+(N, 9, 9) array ready for Puzzle.setnums or solver.solve_many.
+
+    header   16 bytes: b"SUDOKUPZ", version, board order, flags, 0,
+             and the record size (uint32, little-endian)
+    record   givens, then (if the flags say so) the solution, then
+             the status (one byte: 0 unknown, 1 solved, 2 stalled,
+             3 invalid)
+
+Packed files (the default, up to 9x9) keep two cells to a byte, so a
+9x9 puzzle is 41 bytes (83 with solution and status), and a slice is
+unpacked in one go.  Unpacked files keep one cell to a byte, and then
+slices are views straight into the file (no copy at all).
+
+    python3 binio.py puzzles.txt puzzles.bin         # text -> binary
+    python3 binio.py puzzles.bin puzzles.txt         # binary -> text
+
+Oct 2026
+"""
+
+import argparse
+import io
+import os
+import struct
+import sys
+import tempfile
+
+import numpy as np
+import puzzle
+import puzzleio
+import units
+
+MAGIC = b"SUDOKUPZ"
+VERSION = 1
+HEADER = struct.Struct("<8sBBBxI")
+
+# flags
+PACKED = 1
+SOLUTIONS = 2
+STATUSES = 4
+
+# status byte -> status (0 is "not solved yet")
+STATUSNAMES = ("", puzzle.SOLVED, puzzle.STALLED, puzzle.INVALID)
+STATUSCODES = {name: code for code, name in enumerate(STATUSNAMES)}
+
+# puzzles written at a time by PuzzleWriter.add
+BUFSIZE = 4096
+
+
+def recorddtype(order=3, flags=PACKED):
+    """np.dtype of one record, for a board of order with these flags"""
+    ncells = units.tables(order).ncells
+    if flags & PACKED:
+        cells = ("u1", ((ncells + 1) // 2,))
+    else:
+        cells = ("i1", (ncells,))
+    fields = [("givens",) + cells]
+    if flags & SOLUTIONS:
+        fields.append(("solution",) + cells)
+    if flags & STATUSES:
+        fields.append(("status", "u1"))
+    return np.dtype(fields)
+
+
+def pack(nums):
+    """(N, ncells) numbers -> (N, (ncells+1)//2) bytes, two to a byte"""
+    count, ncells = nums.shape
+    padded = np.zeros((count, ncells + ncells % 2), dtype=np.uint8)
+    padded[:, :ncells] = nums
+    return (padded[:, 0::2] << 4) | padded[:, 1::2]
+
+
+def unpack(packed, ncells):
+    """(N, nbytes) bytes from pack -> (N, ncells) int8 numbers"""
+    nums = np.empty((len(packed), 2 * packed.shape[1]), dtype=np.int8)
+    nums[:, 0::2] = packed >> 4
+    nums[:, 1::2] = packed & 0xF
+    return nums[:, :ncells]
+
+
+class PuzzleFile():
+    """a binary puzzle file, memory-mapped (read-only)"""
+
+    def __init__(self, path):
+        """open path, and check its header"""
+        self.path = path
+        with open(path, "rb") as infile:
+            header = infile.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("%s: too short for a puzzle file" % path)
+        magic, version, order, flags, recordsize = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s: not a version %d puzzle file"
+                             % (path, VERSION))
+        self.order = order
+        self.flags = flags
+        self.dtype = recorddtype(order, flags)
+        if recordsize != self.dtype.itemsize:
+            raise ValueError("%s: bad record size %d" % (path, recordsize))
+        self.size = order * order
+        self.ncells = self.size * self.size
+        # (a record cut short at the end, by a crash, is left out)
+        count = (os.path.getsize(path) - HEADER.size) // recordsize
+        if count:
+            self.records = np.memmap(path, self.dtype, "r", HEADER.size,
+                                     (count,))
+        else:
+            self.records = np.zeros(0, self.dtype)
+
+    def __repr__(self):
+        """every class should have a repr"""
+        return "%s(%r)" % (self.__class__.__name__, self.path)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        """the givens of puzzle index (size x size np.array), or of a
+        slice of puzzles (N x size x size)"""
+        if isinstance(index, slice):
+            return self._cells("givens", index)
+        return self._cells("givens", slice(index, index + 1 or None))[0]
+
+    def close(self):
+        """let go of the file (arrays from it stay usable)"""
+        self.records = np.zeros(0, self.dtype)
+
+    def hassolutions(self):
+        """True if the records have solutions (and statuses)"""
+        return bool(self.flags & SOLUTIONS)
+
+    def nums(self, start=0, stop=None):
+        """givens of puzzles start to stop, as an (N, size, size) array"""
+        return self._cells("givens", slice(start, stop))
+
+    def solutions(self, start=0, stop=None):
+        """solutions of puzzles start to stop (N, size, size)"""
+        if not self.flags & SOLUTIONS:
+            raise ValueError("%s has no solutions" % self.path)
+        return self._cells("solution", slice(start, stop))
+
+    def statuses(self, start=0, stop=None):
+        """list of statuses of puzzles start to stop ("" if unknown)"""
+        if not self.flags & STATUSES:
+            return [""] * len(self.records[start:stop])
+        return [STATUSNAMES[code] for code in
+                self.records["status"][start:stop].tolist()]
+
+    def _cells(self, field, which):
+        """one field of a slice of records, as (N, size, size)"""
+        cells = self.records[field][which]
+        if self.flags & PACKED:
+            cells = unpack(cells, self.ncells)
+        return cells.reshape(len(cells), self.size, self.size)
+
+
+class PuzzleWriter():
+    """write a binary puzzle file, a record at a time or many at once"""
+
+    def __init__(self, path, order=3, solutions=False, packed=None):
+        """create path for boards of order; solutions=True also keeps a
+        solution and a status for each puzzle, and packed (default:
+        if the numbers fit in 4 bits) puts two cells in a byte"""
+        if packed is None:
+            packed = order <= 3
+        elif packed and order > 3:
+            raise ValueError("numbers past 15 don't fit in half a byte")
+        self.path = path
+        self.order = order
+        self.size = order * order
+        self.flags = (PACKED if packed else 0) \
+            | (SOLUTIONS | STATUSES if solutions else 0)
+        self.dtype = recorddtype(order, self.flags)
+        self.outfile = open(path, "wb")
+        self.outfile.write(HEADER.pack(MAGIC, VERSION, order, self.flags,
+                                       self.dtype.itemsize))
+        self.count = 0
+        self.pending = []
+
+    def __repr__(self):
+        """every class should have a repr"""
+        return "%s(%r, %d)" % (self.__class__.__name__, self.path, self.order)
+
+    def add(self, nums, solution=None, status=""):
+        """add one puzzle (written in batches of BUFSIZE)"""
+        self.pending.append((nums, solution, status))
+        if len(self.pending) >= BUFSIZE:
+            self.flush()
+
+    def flush(self):
+        """write out the puzzles from add"""
+        if not self.pending:
+            return
+        pending = self.pending
+        self.pending = []
+        nums = np.array([p[0] for p in pending])
+        solutions = statuses = None
+        if self.flags & SOLUTIONS:
+            solutions = np.array([np.zeros_like(nums) if solution is None
+                                  else solution
+                                  for nums, solution, _ in pending])
+            statuses = [status for _, _, status in pending]
+        self.addmany(nums, solutions, statuses)
+
+    def addmany(self, nums, solutions=None, statuses=None):
+        """add an (N, size, size) array of puzzles (and their solutions
+        and list of statuses, if the file has them)"""
+        self.flush()
+        nums = np.asarray(nums)
+        count = len(nums)
+        if nums.shape[1:] != (self.size, self.size):
+            raise ValueError("puzzles should be %dx%d"
+                             % (self.size, self.size))
+        records = np.zeros(count, self.dtype)
+        records["givens"] = self._cells(nums)
+        if self.flags & SOLUTIONS:
+            if solutions is not None:
+                records["solution"] = self._cells(np.asarray(solutions))
+            if statuses is not None:
+                records["status"] = [STATUSCODES[s] for s in statuses]
+        self.outfile.write(records.tobytes())
+        self.count += count
+
+    def _cells(self, nums):
+        """(N, size, size) numbers as they go in a record"""
+        flat = nums.reshape(len(nums), -1)
+        if self.flags & PACKED:
+            return pack(flat)
+        return flat
+
+    def close(self):
+        """write out anything left, and close the file"""
+        self.flush()
+        self.outfile.close()
+
+
+def fromtext(puzzlefile, path, order=3, solutionfile=None, packed=None):
+    """write the puzzles in a text file (see puzzleio.py) to a binary
+    file, return how many were written (lines that aren't size x size
+    puzzles are left out)
+
+    with solutionfile (lines of "solution status", as written by
+    puzzleio.solvefile), the binary file has solutions too
+    """
+    size = order * order
+    writer = PuzzleWriter(path, order, solutionfile is not None, packed)
+    if solutionfile is None:
+        for nums in puzzleio.readpuzzles(puzzlefile):
+            if nums is not None and nums.shape == (size, size):
+                writer.add(nums)
+    else:
+        puzzles = (line for line in puzzlefile
+                   if line.strip() and not line.startswith("#"))
+        for line, result in zip(puzzles, solutionfile):
+            try:
+                nums = puzzleio.parse(line)
+                solution, status = result.split()[:2]
+                solution = puzzleio.parse(solution)
+            except ValueError:
+                continue
+            if nums.shape == solution.shape == (size, size):
+                writer.add(nums, solution, status)
+    writer.close()
+    return writer.count
+
+
+def totext(path, puzzlefile, solutionfile=None, batchsize=BUFSIZE):
+    """write the puzzles in a binary file as text lines (and, if it
+    has them and solutionfile is given, "solution status" lines),
+    return how many"""
+    pfile = PuzzleFile(path)
+    for start in range(0, len(pfile), batchsize):
+        for nums in pfile.nums(start, start + batchsize):
+            puzzlefile.write(puzzleio.tostring(nums) + "\n")
+        if solutionfile is not None and pfile.hassolutions():
+            for solution, status in zip(
+                    pfile.solutions(start, start + batchsize),
+                    pfile.statuses(start, start + batchsize)):
+                solutionfile.write("%s %s\n" % (puzzleio.tostring(solution),
+                                                status))
+    count = len(pfile)
+    pfile.close()
+    return count
+
+
+def _tests():
+    """minimal tests for binary puzzle files"""
+    text = ("# shortz, twice, and a bad line\n"
+            ".395........8...7.....1.9.41..4....3....."
+            "......7...86...67.82...1..9...5.....1..8\n"
+            "03950000000080007000001090410040000300000"
+            "0000007000860006708200010090005000001008\n"
+            "not a puzzle\n")
+    assert recorddtype().itemsize == 41
+    assert recorddtype(3, PACKED | SOLUTIONS | STATUSES).itemsize == 83
+    nums = np.random.default_rng(1).integers(0, 10, (5, 81))
+    assert (unpack(pack(nums), 81) == nums).all()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "puzzles.bin")
+        assert fromtext(io.StringIO(text), path) == 2
+        assert os.path.getsize(path) == HEADER.size + 2 * 41
+        pfile = PuzzleFile(path)
+        print(pfile, len(pfile))
+        shortz = puzzleio.parse(text.splitlines()[2])
+        assert (pfile[1] == shortz).all() and (pfile[-1] == shortz).all()
+        assert pfile.nums().shape == (2, 9, 9)
+        assert pfile.statuses() == ["", ""]
+        out = io.StringIO()
+        assert totext(path, out) == 2
+        assert out.getvalue().splitlines() == [text.splitlines()[2]] * 2
+        # with solutions
+        solved = io.StringIO()
+        puzzleio.solvefile(io.StringIO(text), solved, workers=1)
+        assert fromtext(io.StringIO(text), path,
+                        solutionfile=io.StringIO(solved.getvalue())) == 2
+        pfile = PuzzleFile(path)
+        assert pfile.hassolutions()
+        assert pfile.solutions().all()
+        assert pfile.statuses() == [puzzle.SOLVED] * 2
+        out, sols = io.StringIO(), io.StringIO()
+        totext(path, out, sols)
+        assert sols.getvalue().splitlines() == \
+            solved.getvalue().splitlines()[:2]
+        # unpacked: slices are views of the file itself
+        path = os.path.join(tmpdir, "unpacked.bin")
+        writer = PuzzleWriter(path, packed=False)
+        writer.addmany(np.array([shortz, shortz.T, shortz[::-1]]))
+        writer.add(shortz)
+        writer.close()
+        pfile = PuzzleFile(path)
+        view = pfile.nums(1, 3)
+        assert not view.flags.owndata and isinstance(view.base, np.memmap)
+        assert (view[0] == shortz.T).all() and len(pfile) == 4
+        # 16x16: a byte per cell
+        path = os.path.join(tmpdir, "big.bin")
+        big = np.zeros((16, 16), dtype=np.int8)
+        big[0, 0] = 16
+        writer = PuzzleWriter(path, order=4)
+        writer.add(big)
+        writer.close()
+        assert (PuzzleFile(path)[0] == big).all()
+        pfile.close()
+    print("all ok")
+
+
+def main():
+    """convert between text and binary (binio.py infile outfile: which
+    way depends on infile), or with no args run some minimal tests"""
+    if len(sys.argv) == 1:
+        _tests()
+        return
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("infile", help="text or binary puzzle file")
+    parser.add_argument("outfile", help="binary or text puzzle file")
+    parser.add_argument("--solutions",
+                        help="solution lines (from puzzleio.py) to go with "
+                        "the text puzzles")
+    parser.add_argument("--order", type=int, default=3,
+                        help="board order (3 is 9x9, 4 is 16x16)")
+    parser.add_argument("--unpacked", action="store_true",
+                        help="one cell to a byte")
+    args = parser.parse_args()
+
+    with open(args.infile, "rb") as infile:
+        isbinary = infile.read(len(MAGIC)) == MAGIC
+    if isbinary:
+        solutionfile = open(args.solutions, "w") if args.solutions else None
+        with open(args.outfile, "w") as outfile:
+            count = totext(args.infile, outfile, solutionfile)
+        if solutionfile:
+            solutionfile.close()
+    else:
+        solutionfile = open(args.solutions) if args.solutions else None
+        with open(args.infile) as infile:
+            count = fromtext(infile, args.outfile, args.order, solutionfile,
+                             False if args.unpacked else None)
+        if solutionfile:
+            solutionfile.close()
+    print("wrote", count, "puzzles")
+
+
+if __name__ == "__main__":
+    main()
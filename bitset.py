@@ -0,0 +1,87 @@
+"""
+bitmask helpers for sudoku candidate sets
+
+A set of candidate numbers is stored as one small int: number n
+(1-9) is bit n-1, so 0x1ff means "any of 1-9" and 0 means "none".
+Subset tests, unions and eliminations are then single int ops.
+
+Bigger boards (16x16, 25x25, ...) use the same layout with more bits:
+the DIGITS table only covers 9 bits, so the functions work for any
+size of mask, and maskdtype() picks a numpy type wide enough.
+
+Oct 2026
+"""
+
+import numpy as np
+
+NBITS = 9
+ALL = (1 << NBITS) - 1
+
+# BIT[n] is the mask for number n (BIT[0] is 0, for empty cells)
+BIT = [0] + [1 << (n - 1) for n in range(1, NBITS + 1)]
+
+# lookup table indexed by mask
+DIGITS = [tuple(n for n in range(1, NBITS + 1) if mask & BIT[n])
+          for mask in range(ALL + 1)]
+
+# how numbers print: 1-9, then letters (so a 25x25 board uses 1-9A-P)
+SYMBOLS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+
+def allmask(nbits):
+    """mask with all of the numbers 1..nbits"""
+    return (1 << nbits) - 1
+
+
+def maskdtype(nbits):
+    """smallest unsigned numpy type that holds a mask of nbits numbers"""
+    for dtype in (np.uint16, np.uint32, np.uint64):
+        if nbits <= np.iinfo(dtype).bits:
+            return dtype
+    raise ValueError("no mask type for %d numbers" % nbits)
+
+
+def tomask(nums):
+    """turn a list of numbers into a mask"""
+    mask = 0
+    for num in nums:
+        if num:
+            mask |= 1 << (num - 1)
+    return mask
+
+
+def tonums(mask):
+    """turn a mask into a sorted list of numbers"""
+    mask = int(mask)
+    if mask <= ALL:
+        return list(DIGITS[mask])
+    nums = []
+    while mask:
+        bit = mask & -mask
+        nums.append(bit.bit_length())
+        mask ^= bit
+    return nums
+
+
+def tostr(mask):
+    """numbers in mask as a string, like "126" (or "1AG" past 9)"""
+    return "".join(SYMBOLS[num] for num in tonums(mask))
+
+
+def main():
+    """minimal tests for the bitset helpers"""
+    mask = tomask([1, 2, 6])
+    print("mask for 126:", bin(mask))
+    assert tonums(mask) == [1, 2, 6]
+    assert tonums(ALL) == list(range(1, 10))
+    assert tomask([2, 6]) & ~mask == 0
+    big = tomask([1, 10, 16, 25])
+    assert tonums(big) == [1, 10, 16, 25]
+    assert tostr(big) == "1AGP"
+    assert big & ~allmask(25) == 0
+    assert maskdtype(9) == np.uint16 and maskdtype(25) == np.uint32
+    print("all ok")
+
+
+if __name__ == "__main__":
+    main()
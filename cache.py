@@ -0,0 +1,113 @@
+"""
+LRU cache of solved puzzles, keyed by canonical form
+
+Puzzles that are the same up to symmetry (see canon.py) share one
+cache entry, so a hit is just moving the stored solution back, with
+no findforced/findpss at all.  Only 9x9 puzzles are cached: other
+sizes go straight to solver.solve.
+
+Oct 2026
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import canon
+import puzzle
+import solver
+
+
+class SolutionCache():
+    """least-recently-used cache in front of solver.solve"""
+
+    def __init__(self, maxsize=10000):
+        """create an empty cache holding up to maxsize solutions"""
+        self.maxsize = maxsize
+        self.entries = OrderedDict()   # canonical string -> (status, grid)
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        """every class should have a repr"""
+        return "%s(%d)" % (self.__class__.__name__, self.maxsize)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def solve(self, nums):
+        """like solver.solve: return (status, solution) for nums"""
+        nums = np.asarray(nums)
+        if nums.shape != (9, 9):
+            # (canon.py only knows 9x9 boards)
+            return solver.solve(nums)
+        if nums.min() < 0 or nums.max() > 9:
+            return puzzle.INVALID, nums
+        form, transform = canon.canonical(nums)
+        key = form.tobytes()
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            status, solution = self.entries[key]
+        else:
+            self.misses += 1
+            status, solution = solver.solve(form)
+            self.entries[key] = (status, solution)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return status, canon.undo(solution, transform)
+
+    def stats(self):
+        """dict of hits, misses, hit rate, and size"""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hitrate": self.hits / lookups if lookups else 0.0,
+                "size": len(self.entries),
+                "maxsize": self.maxsize}
+
+    def clear(self):
+        """empty the cache and reset the stats"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def main():
+    """minimal tests for the solution cache"""
+    shortz = np.array([[0, 3, 9, 5, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 8, 0, 0, 0, 7, 0],
+                       [0, 0, 0, 0, 1, 0, 9, 0, 4],
+                       [1, 0, 0, 4, 0, 0, 0, 0, 3],
+                       [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 7, 0, 0, 0, 8, 6, 0],
+                       [0, 0, 6, 7, 0, 8, 2, 0, 0],
+                       [0, 1, 0, 0, 9, 0, 0, 0, 5],
+                       [0, 0, 0, 0, 0, 1, 0, 0, 8]])
+    relabeled = np.where(shortz > 0, 10 - shortz, 0)
+    cache = SolutionCache(maxsize=2)
+    status, solution = cache.solve(shortz)
+    print(status)
+    print(solution)
+    for grid in (shortz.T, relabeled, shortz[[2, 1, 0, 3, 4, 5, 6, 7, 8]]):
+        status, other = cache.solve(grid)
+        assert status == puzzle.SOLVED
+        assert ((grid == 0) | (grid == other)).all()
+        assert (other == solver.solve(grid)[1]).all()
+    print(cache.stats())
+    assert cache.stats()["hits"] == 3
+    cache.solve(np.zeros((9, 9), dtype=int))
+    cache.solve(shortz.T.copy()[::-1])
+    assert len(cache) == 2
+    # other sizes aren't cached, but still solved
+    stats = cache.stats()
+    big = np.zeros((16, 16), dtype=int)
+    big[0, :4] = [1, 2, 3, 4]
+    status, solution = cache.solve(big)
+    assert status == puzzle.SOLVED and (solution[0, :4] == big[0, :4]).all()
+    assert cache.solve(np.zeros((5, 5), dtype=int))[0] == puzzle.INVALID
+    assert cache.stats() == stats
+    print("all ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+sudoku symmetries: map a grid to a canonical form
+
+These changes give an "equivalent" puzzle (same solution, moved
+around the same way):
+    - transpose (swap rows and cols)
+    - reorder the bands (groups of 3 rows), or rows inside a band
+    - reorder the stacks (groups of 3 cols), or cols inside a stack
+    - relabel the numbers
+
+A Transform records one of these as (transpose, rows, cols, digits):
+the new grid is old[rows][:, cols] (after transposing, if asked),
+with each number n replaced by digits[n].
+
+canonical() picks a transform by sorting bands/rows/stacks/cols by
+how many givens they have, trying the orders where those counts tie,
+and keeping the smallest grid (as a string) after relabeling the
+numbers in order of first use.  Equal results always mean equivalent
+puzzles.  It is not a complete canonical form (a few equivalent
+puzzles can still come out different) but that only costs a cache
+miss, never a wrong answer.
+
+Oct 2026
+"""
+
+from collections import namedtuple
+from itertools import islice, permutations, product
+
+import numpy as np
+
+Transform = namedtuple("Transform", ["transpose", "rows", "cols", "digits"])
+
+IDENTITY = Transform(False, tuple(range(9)), tuple(range(9)),
+                     tuple(range(10)))
+# at most this many row (and col) orders are tried for each orientation
+MAXORDERS = 8
+
+
+def apply(nums, transform):
+    """return nums (9x9) moved/relabeled by transform"""
+    nums = np.asarray(nums)
+    if transform.transpose:
+        nums = nums.T
+    nums = nums[list(transform.rows)][:, list(transform.cols)]
+    return np.asarray(transform.digits, dtype=np.int8)[nums]
+
+
+def undo(nums, transform):
+    """inverse of apply: map a transformed grid back"""
+    nums = np.asarray(nums)
+    inverse = np.zeros(10, dtype=np.int8)
+    inverse[list(transform.digits)] = np.arange(10)
+    out = np.zeros((9, 9), dtype=np.int8)
+    out[np.ix_(transform.rows, transform.cols)] = inverse[nums]
+    if transform.transpose:
+        out = out.T
+    return out
+
+
+def _orders(keys):
+    """all orders of 3 items, biggest key first, trying each order of ties"""
+    ranked = sorted(range(3), key=lambda j: keys[j], reverse=True)
+    groups = []
+    for j in ranked:
+        if groups and keys[groups[-1][0]] == keys[j]:
+            groups[-1].append(j)
+        else:
+            groups.append([j])
+    options = [list(permutations(group)) for group in groups]
+    return [sum(choice, ()) for choice in product(*options)]
+
+
+def _lineorders(filled):
+    """candidate row orders for a 0/1 9x9 array of givens
+
+    rows are ranked by (givens, sorted givens per stack), which doesn't
+    change under any of the symmetries that keep rows as rows
+    """
+    perstack = filled.reshape(9, 3, 3).sum(axis=2)
+    rowkeys = [(int(perstack[r].sum()), tuple(sorted(perstack[r])))
+               for r in range(9)]
+    bandkeys = [tuple(sorted(rowkeys[3*b:3*b + 3])) for b in range(3)]
+    bandorders = _orders(bandkeys)
+    inband = [[tuple(3*b + j for j in order)
+               for order in _orders(rowkeys[3*b:3*b + 3])]
+              for b in range(3)]
+    for bands in bandorders:
+        for rows in product(*(inband[b] for b in bands)):
+            yield sum(rows, ())
+
+
+def _relabel(nums):
+    """digit map (tuple of 10) numbering digits in order of first use"""
+    digits = [0] * 10
+    nextlabel = 1
+    for num in nums:
+        if num and not digits[num]:
+            digits[num] = nextlabel
+            nextlabel += 1
+    for num in range(1, 10):
+        if not digits[num]:
+            digits[num] = nextlabel
+            nextlabel += 1
+    return tuple(digits)
+
+
+def canonical(nums):
+    """return (canonical 9x9 grid, Transform that makes it from nums)"""
+    nums = np.asarray(nums, dtype=np.int8)
+    best = None
+    for transpose in (False, True):
+        grid = nums.T if transpose else nums
+        filled = (grid != 0).astype(np.int8)
+        roworders = list(islice(_lineorders(filled), MAXORDERS))
+        colorders = list(islice(_lineorders(filled.T), MAXORDERS))
+        for rows in roworders:
+            moved = grid[list(rows)]
+            for cols in colorders:
+                flat = moved[:, list(cols)].ravel().tolist()
+                digits = _relabel(flat)
+                key = [digits[n] for n in flat]
+                if best is None or key < best[0]:
+                    best = (key, Transform(transpose, rows, cols, digits))
+    key, transform = best
+    return np.array(key, dtype=np.int8).reshape(9, 9), transform
+
+
+def main():
+    """minimal tests for the canonical form"""
+    shortz = np.array([[0, 3, 9, 5, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 8, 0, 0, 0, 7, 0],
+                       [0, 0, 0, 0, 1, 0, 9, 0, 4],
+                       [1, 0, 0, 4, 0, 0, 0, 0, 3],
+                       [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 7, 0, 0, 0, 8, 6, 0],
+                       [0, 0, 6, 7, 0, 8, 2, 0, 0],
+                       [0, 1, 0, 0, 9, 0, 0, 0, 5],
+                       [0, 0, 0, 0, 0, 1, 0, 0, 8]])
+    form, transform = canonical(shortz)
+    print(form)
+    print(transform)
+    assert (apply(shortz, transform) == form).all()
+    assert (undo(form, transform) == shortz).all()
+    # a shuffled/relabeled copy should give the same canonical form
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        bands = rng.permutation(3)
+        rows = tuple(int(3*b + j) for b in bands for j in rng.permutation(3))
+        stacks = rng.permutation(3)
+        cols = tuple(int(3*s + j) for s in stacks for j in rng.permutation(3))
+        digits = (0,) + tuple(int(d) for d in rng.permutation(9) + 1)
+        shuffle = Transform(bool(rng.integers(2)), rows, cols, digits)
+        other = apply(shortz, shuffle)
+        assert (undo(other, shuffle) == shortz).all()
+        otherform, othertransform = canonical(other)
+        assert (apply(other, othertransform) == otherform).all()
+        assert (otherform == form).all()
+    print("all ok")
+
+
+if __name__ == "__main__":
+    main()
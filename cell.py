@@ -7,14 +7,37 @@ J. Knerr
 
 
 class Cell():
-    """one cell in a sudoku puzzle"""
+    """one cell in a sudoku puzzle
 
-    def __init__(self, row=0, col=0, num=0):
+    if board (a size x size np.array) is given, the cell is just a view of
+    board[row, col], and num is read from and written to the board
+    """
+
+    __slots__ = ("row", "col", "board", "_num")
+
+    def __init__(self, row=0, col=0, num=0, board=None):
         """constuctor for cell class: default is 0,0,0"""
 
         self.row = row
         self.col = col
-        self.num = num
+        self.board = board
+        self._num = num
+        if board is not None and num:
+            board[row, col] = num
+
+    @property
+    def num(self):
+        """the number in this cell (0 if empty)"""
+        if self.board is None:
+            return self._num
+        return int(self.board[self.row, self.col])
+
+    @num.setter
+    def num(self, num):
+        if self.board is None:
+            self._num = num
+        else:
+            self.board[self.row, self.col] = num
 
     def __repr__(self):
         """every class should have a repr"""
@@ -49,6 +72,7 @@ class Cell():
 
 def main():
     """minimal tests for the cell class"""
+    import numpy as np
     cell1 = Cell()
     print("cell1:", cell1)
     row = 2
@@ -69,6 +93,12 @@ def main():
     print("cell3:", cell3)
     print("cell1 equals cell2:", cell1 == cell2)
     print("cell3 equals cell2:", cell3 == cell2)
+    board = np.zeros((9, 9), dtype=np.int8)
+    cell4 = Cell(row, col, board=board)
+    cell4.setnum(num)
+    print("cell4 (view of board):", cell4)
+    assert board[row, col] == num
+    assert cell4 == cell2
 
 
 if __name__ == "__main__":
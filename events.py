@@ -0,0 +1,129 @@
+"""
+listeners for what the solver is doing
+
+A Puzzle calls these methods on every listener added with
+Puzzle.addlistener().  With no listeners, the solver doesn't even
+build the arguments, so quiet solving costs nothing extra.
+
+technique is one of "forced", "singleton", "pss", or "search" (or
+"user", for numbers put in with Puzzle.place).
+
+Oct 2026
+"""
+
+from bitset import tostr
+
+
+class Listener():
+    """base listener: does nothing, override the events you want"""
+
+    def __repr__(self):
+        """every class should have a repr"""
+        return "%s()" % (self.__class__.__name__)
+
+    def placed(self, row, col, num, technique):
+        """num was put in cell row, col"""
+
+    def eliminated(self, row, col, mask, technique):
+        """the numbers in mask were taken out of the row, col markup"""
+
+    def psfound(self, pset):
+        """a new preemptive set was found"""
+
+    def passdone(self, name, changes):
+        """a findforced/findpss/filtermarkups pass finished, after
+        making this many changes"""
+
+
+class LogListener(Listener):
+    """print what is happening, for humans"""
+
+    def __init__(self, eliminations=False):
+        """eliminations=True also prints every removed number"""
+        self.eliminations = eliminations
+
+    def placed(self, row, col, num, technique):
+        if technique == "forced":
+            print("FOUND: %d in %s" % (num, (row, col)))
+        else:
+            print("%s!! (%d,%d): %d" % (technique, row, col, num))
+
+    def eliminated(self, row, col, mask, technique):
+        if self.eliminations:
+            print("  %s: removed %s from (%d,%d)"
+                  % (technique, tostr(mask), row, col))
+
+    def psfound(self, pset):
+        print("preemptive set:", pset)
+
+    def passdone(self, name, changes):
+        print("%s: %d changes" % (name, changes))
+
+
+class CountListener(Listener):
+    """count everything (by technique, size, or pass name)"""
+
+    def __init__(self):
+        """start with all counts at zero"""
+        self.reset()
+
+    def reset(self):
+        """all counts back to zero (to count the next puzzle)"""
+        self.placements = {}     # technique -> count
+        self.eliminations = {}   # technique -> numbers removed
+        self.presets = {}        # preemptive set size -> count
+        self.passes = {}         # pass name -> count
+
+    def placed(self, row, col, num, technique):
+        self.placements[technique] = self.placements.get(technique, 0) + 1
+
+    def eliminated(self, row, col, mask, technique):
+        self.eliminations[technique] = \
+            self.eliminations.get(technique, 0) + bin(mask).count("1")
+
+    def psfound(self, pset):
+        size = pset.getsize()
+        self.presets[size] = self.presets.get(size, 0) + 1
+
+    def passdone(self, name, changes):
+        self.passes[name] = self.passes.get(name, 0) + 1
+
+    def getcounts(self):
+        """all the counts, as a dict of dicts"""
+        return {"placements": self.placements,
+                "eliminations": self.eliminations,
+                "presets": self.presets,
+                "passes": self.passes}
+
+
+def main():
+    """minimal tests for the listeners"""
+    import numpy as np
+    import puzzle
+    shortz = np.array([[0, 3, 9, 5, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 8, 0, 0, 0, 7, 0],
+                       [0, 0, 0, 0, 1, 0, 9, 0, 4],
+                       [1, 0, 0, 4, 0, 0, 0, 0, 3],
+                       [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 7, 0, 0, 0, 8, 6, 0],
+                       [0, 0, 6, 7, 0, 8, 2, 0, 0],
+                       [0, 1, 0, 0, 9, 0, 0, 0, 5],
+                       [0, 0, 0, 0, 0, 1, 0, 0, 8]])
+    counter = CountListener()
+    puzz = puzzle.Puzzle()
+    puzz.setnums(shortz)
+    puzz.addlistener(counter)
+    print(puzz.solve())
+    counts = counter.getcounts()
+    print(counts)
+    placed = sum(counts["placements"].values())
+    assert placed == (shortz == 0).sum()
+    puzz = puzzle.Puzzle()
+    puzz.setnums(shortz)
+    puzz.addlistener(LogListener())
+    puzz.findforced()
+    print("all ok")
+
+
+if __name__ == "__main__":
+    main()
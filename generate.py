@@ -0,0 +1,178 @@
+"""
+make new sudoku puzzles, each with just one solution
+
+A puzzle starts as a random solved grid: the boxes on the diagonal
+(which share no rows or cols) get random numbers, and the solver
+fills in the rest.  Then the givens are taken out one at a time, in
+random order, and put back if the puzzle no longer has exactly one
+solution (see Puzzle.countsolutions).  What is left is minimal:
+taking out any other given would allow a second solution.
+
+    python3 generate.py 100 puzzles.txt         # 100 puzzles, one per line
+    python3 generate.py 1000 --corpus corpus    # ...added to the bench
+                                                # buckets, by difficulty
+
+Oct 2026
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import puzzle
+import puzzleio
+import solver
+
+
+def solvedgrid(rng, order=3, tries=100):
+    """a random solved grid (size x size np.array)"""
+    size = order * order
+    puzz = puzzle.Puzzle(order=order)
+    for _ in range(tries):
+        nums = np.zeros((size, size), dtype=np.int8)
+        for box in range(order):
+            rows = slice(box*order, box*order + order)
+            nums[rows, rows] = (rng.permutation(size) + 1).reshape(order,
+                                                                  order)
+        puzz.setnums(nums)
+        # (on small boards the diagonal can already be stuck: try again)
+        if puzz.solve() == puzzle.SOLVED:
+            return puzz.getnums()
+    raise ValueError("couldn't fill in a %dx%d grid" % (size, size))
+
+
+def generate(rng=None, order=3, symmetric=False):
+    """a random puzzle with one solution, and as few givens as that
+    allows (with symmetric=True, givens are taken out in pairs, so the
+    puzzle looks the same turned upside down)
+
+    A given whose removal can't be checked (countsolutions() ran out
+    of nodes, and returned None) is put back, like one that allows a
+    second solution: the puzzle may then not be minimal, but it is
+    still unique.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    nums = solvedgrid(rng, order)
+    flat = nums.reshape(-1)
+    ncells = len(flat)
+    puzz = puzzle.Puzzle(order=order)
+    for i in rng.permutation(ncells).tolist():
+        cells = [i]
+        if symmetric:
+            if i > ncells - 1 - i:
+                continue
+            cells = sorted({i, ncells - 1 - i})
+        saved = flat[cells].copy()
+        flat[cells] = 0
+        puzz.setnums(nums)
+        if puzz.countsolutions() != 1:
+            flat[cells] = saved
+    return nums
+
+
+def grade(nums):
+    """which bench.py bucket nums goes in: "forced" (findforced and
+    singletons solve it), "pss" (needs preemptive sets, but no
+    search), or "stall" """
+    status, _, techniques = solver._solve(nums)
+    if status != puzzle.SOLVED or "search" in techniques:
+        return "stall"
+    if "pss" not in techniques:
+        return "forced"
+    return "pss"
+
+
+def _generatechunk(args):
+    """worker: make puzzles for a list of (seed, index)"""
+    seeds, order, symmetric = args
+    return [generate(np.random.default_rng(seed), order, symmetric)
+            for seed in seeds]
+
+
+def generate_many(count, seed=0, order=3, symmetric=False, workers=None,
+                  chunksize=8):
+    """yield count new puzzles, made in worker processes
+
+    The same seed always gives the same puzzles, in the same order (no
+    matter how many workers), and only a few chunks per worker are
+    made ahead, so count can be huge.
+    """
+    chunks = ((list((seed, index) for index in
+                    range(start, min(start + chunksize, count))),
+               order, symmetric)
+              for start in range(0, count, chunksize))
+    return solver._mapchunks(_generatechunk, chunks, workers)
+
+
+def _tests():
+    """minimal tests for the generator"""
+    rng = np.random.default_rng(1)
+    grid = solvedgrid(rng)
+    assert grid.all() and solver.count_solutions(grid) == 1
+    nums = generate(rng)
+    print(puzzleio.tostring(nums), (nums > 0).sum(), "givens")
+    assert solver.count_solutions(nums) == 1
+    assert ((nums == 0) | (nums == solver.solve(nums)[1])).all()
+    # every given is needed
+    for i in np.flatnonzero(nums).tolist()[:10]:
+        fewer = nums.copy().reshape(-1)
+        fewer[i] = 0
+        assert solver.count_solutions(fewer.reshape(nums.shape)) == 2
+    nums = generate(rng, symmetric=True)
+    assert ((nums > 0) == (nums[::-1, ::-1] > 0)).all()
+    small = generate(rng, order=2)
+    print(puzzleio.tostring(small))
+    assert solver.count_solutions(small) == 1
+    first = [puzzleio.tostring(p) for p in generate_many(6, seed=3,
+                                                         workers=2,
+                                                         chunksize=2)]
+    again = [puzzleio.tostring(p) for p in generate_many(6, seed=3,
+                                                         workers=1)]
+    assert first == again and len(set(first)) == 6
+    print([grade(puzzleio.parse(line)) for line in first])
+    print("all ok")
+
+
+def main():
+    """generate.py count [outfile] (see the top of this file), or with
+    no args run some minimal tests"""
+    if len(sys.argv) == 1:
+        _tests()
+        return
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("count", type=int, help="how many puzzles")
+    parser.add_argument("outfile", nargs="?", default="-",
+                        help="where to write them (default: stdout)")
+    parser.add_argument("--corpus",
+                        help="instead, add them to DIR/forced.txt, "
+                        "DIR/pss.txt and DIR/stall.txt")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--order", type=int, default=3,
+                        help="board order (3 is 9x9, 4 is 16x16)")
+    parser.add_argument("--symmetric", action="store_true",
+                        help="keep the givens symmetric")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    puzzles = generate_many(args.count, args.seed, args.order,
+                            args.symmetric, args.workers)
+    if args.corpus:
+        counts = {}
+        for nums in puzzles:
+            bucket = grade(nums)
+            with open(os.path.join(args.corpus, bucket + ".txt"),
+                      "a") as outfile:
+                outfile.write(puzzleio.tostring(nums) + "\n")
+            counts[bucket] = counts.get(bucket, 0) + 1
+        print(counts)
+        return
+    outfile = sys.stdout if args.outfile == "-" else open(args.outfile, "w")
+    with outfile:
+        for nums in puzzles:
+            outfile.write(puzzleio.tostring(nums) + "\n")
+
+
+if __name__ == "__main__":
+    main()
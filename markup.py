@@ -6,24 +6,53 @@ J. Knerr
 """
 
 import cell
+from bitset import tomask, tonums, tostr
 
 
 class Markup():
-    """one cell's markup in a sudoku puzzle"""
+    """one cell's markup in a sudoku puzzle
 
-    def __init__(self, size=0, mycell=None, nums=None):
+    if cands (a flat np.array of masks, one per cell) is given, the
+    markup is just a view of cands[index]
+
+    maxnum is the biggest number allowed (9 on a 9x9 board, 16 on a
+    16x16 board, ...)
+    """
+
+    __slots__ = ("mycell", "cands", "index", "maxnum", "_mask")
+
+    def __init__(self, size=0, mycell=None, nums=None, cands=None, index=0,
+                 maxnum=9):
         """constuctor for cell markup class: default is 0,None,None"""
 
-        self.size = size
+        # (size is worked out from the nums)
         self.mycell = mycell
-        if nums is None:
-            self.nums = []
+        self.cands = cands
+        self.index = index
+        self.maxnum = maxnum
+        # nums that could be in this cell, as a bitmask (see bitset.py)
+        self._mask = 0
+        if isinstance(nums, list):
+            self.setnums(nums)
+
+    @property
+    def mask(self):
+        """nums that could be in this cell, as a bitmask"""
+        if self.cands is None:
+            return self._mask
+        return int(self.cands[self.index])
+
+    @mask.setter
+    def mask(self, mask):
+        if self.cands is None:
+            self._mask = mask
         else:
-            if isinstance(nums, list):
-                # nums that could be in this cell
-                self.nums = nums
-            else:
-                self.nums = []
+            self.cands[self.index] = mask
+
+    @property
+    def size(self):
+        """how many nums could be in this cell"""
+        return self.mask.bit_count()
 
     def __repr__(self):
         """every class should have a repr"""
@@ -35,9 +64,7 @@ class Markup():
         mstr = ""
         if self.mycell is not None:
             mstr = "(%d,%d): " % (self.mycell.getrow(), self.mycell.getcol())
-        for num in self.nums:
-            mstr += str(num)
-        return mstr
+        return mstr + tostr(self.mask)
 
     def getsize(self):
         """getter for size of markup"""
@@ -61,11 +88,17 @@ class Markup():
 
     def getnums(self):
         """getter for markup numbers"""
-        return self.nums
+        return tonums(self.mask)
 
-    def setsize(self, size):
-        """setter for size"""
-        self.size = size
+    def getindex(self):
+        """getter for the cell index (row*maxnum + col)"""
+        if self.cands is None and self.mycell is not None:
+            return self.getrow()*self.maxnum + self.getcol()
+        return self.index
+
+    def getmask(self):
+        """getter for markup numbers as a bitmask"""
+        return self.mask
 
     def setcell(self, mycell):
         """setter for mycell"""
@@ -73,49 +106,47 @@ class Markup():
 
     def setnums(self, nums):
         """setter for nums"""
-        self.nums = nums
+        self.setmask(tomask(n for n in nums if 1 <= n <= self.maxnum))
+
+    def setmask(self, mask):
+        """setter for nums as a bitmask"""
+        self.mask = mask
 
     def addnum(self, num):
         """add a number to the markup"""
         if isinstance(num, int):
-            if num not in self.nums:
-                if 1 <= num <= 9:
-                    self.size += 1
-                    self.nums.append(num)
-                    self.nums.sort()
+            if 1 <= num <= self.maxnum:
+                self.mask |= 1 << (num - 1)
         else:
             print("Can only add integers to the markup...")
 
     def rmnum(self, num):
         """remove a number from the markup"""
         if isinstance(num, int):
-            if num in self.nums:
-                self.size -= 1
-                self.nums.remove(num)
+            if 1 <= num <= self.maxnum:
+                self.mask &= ~(1 << (num - 1))
         else:
             print("Can only remove integers from the markup...")
 
+    def hasnum(self, num):
+        """return True if num could be in this cell"""
+        return 1 <= num <= self.maxnum and bool(self.mask >> (num - 1) & 1)
+
     def single(self):
         """return True if markup is singleton"""
-        return len(self.nums) == 1
+        return self.size == 1
 
     def __eq__(self, other):
         """allow test of mark1 == mark2"""
         if isinstance(other, Markup):
-            if self.size == other.size:
-                # if size is same, cell same, and all nums are same
-                if self.mycell == other.mycell:
-                    for num in self.nums:
-                        if num not in other.nums:
-                            return False
-                    return True
-                return False
-            return False
+            # if cell same, and all nums are same
+            return self.mycell == other.mycell and self.mask == other.mask
         return False
 
 
 def main():
     """minimal tests for the cell markup class"""
+    import numpy as np
     row = 2
     col = 3
     num = 0
@@ -148,6 +179,20 @@ def main():
     mark3.setcell(cell1)
     print(mark3)
     print("markup1 == markup3:", mark3 == mark1)
+    cands = np.zeros(81, dtype=np.uint16)
+    mark4 = Markup(0, cell1, [2, 3, 6], cands=cands, index=row*9 + col)
+    mark4.rmnum(3)
+    print("markup4 (view of cands):", mark4, cands[row*9 + col])
+    assert cands[row*9 + col] == mark4.getmask()
+    assert mark4.getsize() == 2
+    assert mark4.getindex() == row*9 + col
+    mark5 = Markup(0, cell1, maxnum=16)
+    mark5.addnum(16)
+    mark5.addnum(10)
+    mark5.addnum(17)
+    print("markup5 (16x16):", mark5)
+    assert mark5.getnums() == [10, 16] and mark5.hasnum(16)
+    assert mark5.getindex() == row*16 + col
 
 
 if __name__ == "__main__":
@@ -7,18 +7,25 @@ J. Knerr
 
 import cell
 import markup
+from bitset import tonums
 
 
 class PreemptiveSet():
     """preemptive set class for solving sudoku puzzles"""
 
-    def __init__(self, pstype):
+    def __init__(self, pstype, unit=None):
         """create a new, empty, preemptive set"""
         # pstype = box, row, or col
+        # unit = which row/col/box (0-26, see units.py), if known
 
         self.size = 0
         self.markups = []
         self.pstype = pstype
+        self.unit = unit
+        # which cells (bit = cell index) and numbers are in the set,
+        # fixed when the markups are added
+        self.cellmask = 0
+        self.mask = 0
         if pstype not in ["box", "row", "col"]:
             raise ValueError("ps type should be box, row, or col")
 
@@ -38,6 +45,9 @@ class PreemptiveSet():
         """add a markup to the ps"""
         self.markups.append(markuptoadd)
         self.size += 1
+        if markuptoadd.mycell is not None:
+            self.cellmask |= 1 << markuptoadd.getindex()
+        self.mask |= markuptoadd.getmask()
 
     def gettype(self):
         """getter for pstype"""
@@ -47,29 +57,41 @@ class PreemptiveSet():
         """getter for size"""
         return self.size
 
+    def getunit(self):
+        """getter for unit"""
+        return self.unit
+
     def getmarkups(self):
         """getter for markups"""
         return self.markups
 
+    def getcellmask(self):
+        """getter for the cells in the set, as a bitmask"""
+        return self.cellmask
+
+    def getkey(self):
+        """(unit, cells, numbers): same key means same preemptive set"""
+        return (self.unit, self.cellmask, self.mask)
+
     def getnums(self):
         """get all numbers in the preemptive set"""
-        nums = []
-        for mark in self.markups:
-            nums += mark.getnums()
-        return list(set(nums))
+        return tonums(self.getmask())
+
+    def getmask(self):
+        """get all numbers in the preemptive set, as a bitmask"""
+        return self.mask
 
     def __eq__(self, other):
         """allow test of ps1 == ps2"""
         if isinstance(other, PreemptiveSet):
-            if self.size == other.size and self.pstype == other.pstype:
-                # if size is same, and all cells are same
-                # assume markups are the same????
-                for mark in self.markups:
-                    if mark not in other.markups:
-                        return False
-                return True
+            return self.pstype == other.pstype and \
+                self.getkey() == other.getkey()
         return False
 
+    def __hash__(self):
+        """so preemptive sets can go in a set or dict"""
+        return hash(self.getkey())
+
 
 def main():
     """minimal tests for the preemptive set class"""
@@ -106,7 +128,14 @@ def main():
     ps3.addmarkup(mark1)
     print("ps3:", ps3)
     print("ps1:", ps1)
+    # mark1 had 367 when it went in ps1, so ps3 (3567) is different
     print("ps1 same as ps3:", ps1 == ps3)
+    ps4 = PreemptiveSet("box")
+    ps4.addmarkup(mark3)
+    ps4.addmarkup(mark2)
+    ps4.addmarkup(mark1)
+    print("ps3 same as ps4:", ps3 == ps4)
+    print("number of different sets:", len({ps1, ps2, ps3, ps4}))
 
 
 if __name__ == "__main__":
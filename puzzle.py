@@ -11,45 +11,212 @@ J. Knerr
 Jan 2020
 """
 
+import time
+from collections import deque, namedtuple
+
 import numpy as np
 import cell
 import markup
 import preemptiveset
+import batch
+import events
+import units
+from bitset import SYMBOLS, allmask, maskdtype, tomask, tonums, tostr
+
+
+# preemptive sets bigger than this aren't looked for: on a 9x9 board
+# that's all of them, but bigger boards have far too many groups of
+# markups per unit, and the small sets do almost all the work
+MAXPSSIZE = 8
+BIGPSSIZE = 4
+
+# what Puzzle.snapshot() saves (besides its place in the trail)
+Snapshot = namedtuple("Snapshot", ["trailsize", "marked", "pss", "dirty",
+                                   "queue", "unitqueue", "techniques"])
+
+# what Puzzle.hint() finds: technique is "forced", "singleton" or
+# "pss", unit is like ("box", 4) (None for a singleton), cells and
+# eliminations are lists of (row, col) and ((row, col), nums)
+Hint = namedtuple("Hint", ["technique", "unit", "cells", "nums",
+                           "eliminations"])
+
+# results from Puzzle.solve()
+SOLVED = "solved"
+STALLED = "stalled"     # preemptive sets stopped making progress
+INVALID = "invalid"     # givens conflict, or no number fits some cell
 
 
 class Puzzle():
-    """sudoku puzzle class"""
+    """sudoku puzzle class
 
-    def __init__(self):
+    The puzzle is just two flat arrays: the numbers (int8, 0 for
+    empty) and the markups (uint16 bitmasks, see bitset.py).  Cell and
+    Markup objects are views of these, only made when asked for.
+
+    order is the box size: 3 for the usual 9x9 board, 4 for 16x16,
+    5 for 25x25 (numbers then run 1 to order*order, and the markups
+    use a wider mask type).
+    """
+
+    def __init__(self, verbose=False, order=3):
         """create empty sudoku puzzle"""
-        self.puzzle = np.zeros((9, 9), dtype=cell.Cell)
-        self.markups = []    # all markups in the puzzle
-        self.pss = []        # preemptive sets
+        self.order = order
+        self.tables = units.tables(order)    # see units.py
+        self.size = self.tables.size         # numbers are 1..size
+        self.all = allmask(self.size)        # mask of all the numbers
+        self.bits = [0] + [1 << (n - 1) for n in range(1, self.size + 1)]
+        self.bitarray = np.array(self.bits, dtype=maskdtype(self.size))
+        self.maxpssize = MAXPSSIZE if order <= 3 else BIGPSSIZE
+        ncells = self.tables.ncells
+        self.board = np.zeros((self.size, self.size), dtype=np.int8)
+        self.flat = self.board.reshape(ncells)   # same numbers, row-major
+        self.cands = np.zeros(ncells, dtype=maskdtype(self.size))  # markups
+        self.marked = False  # have the markups been made yet?
+        self._cells = None   # Cell views (see cells)
+        self._markups = None     # Markup views (see markups)
+        self.pss = {}        # preemptive sets not yet used, by size
+        self.pskeys = set()  # keys of every preemptive set found so far
+        self.dirty = set()   # units with markups changed since last findpss
+        self.queue = deque()     # cells for propagate() to check
+        self.unitqueue = set()   # units for propagate() to check
+        self.techniques = set()  # which methods have placed/filtered nums
+        self.trail = None    # undo log, once snapshot() is used
+        self.listeners = []  # see events.py
+        self.phases = None   # step name -> seconds spent, if timing it
+        if verbose:
+            self.addlistener(events.LogListener())
 
     def setnums(self, nums):
-        """given np.array of nums, create 9x9 puzzle of cells"""
-        for row in range(9):
-            for col in range(9):
-                self.puzzle[row, col] = cell.Cell(row, col, nums[row, col])
+        """given np.array of nums, set up the puzzle (size x size)"""
+        self.board[:] = nums
+        self.cands[:] = 0
+        self.marked = False
+        self.pss = {}
+        self.pskeys = set()
+        self.dirty = set()
+        self.queue = deque()
+        self.unitqueue = set()
+        self.techniques = set()
+        if self.trail is not None:
+            # (old snapshots are of some other puzzle)
+            self.trail = []
+
+    def snapshot(self):
+        """save the state of the puzzle, to go back to with restore()
+
+        Nothing is copied but the few sets of units and cells still to
+        check: from now on every change to a cell is logged in the
+        trail (its old number and markup), as is every preemptive set
+        found or forgotten, and restore() undoes just those changes.
+        Snapshots can be nested, and restoring one also throws away any
+        taken after it.
+        """
+        if self.trail is None:
+            self.trail = []
+        return Snapshot(len(self.trail), self.marked,
+                        {size: list(sets) for size, sets in self.pss.items()},
+                        set(self.dirty), deque(self.queue),
+                        set(self.unitqueue), set(self.techniques))
+
+    def restore(self, snap):
+        """go back to the state saved by snapshot()"""
+        trail = self.trail
+        flat = self.flat
+        cands = self.cands
+        while len(trail) > snap.trailsize:
+            entry = trail.pop()
+            if len(entry) == 1:
+                self.pskeys.discard(entry[0])
+            elif len(entry) == 2:
+                self.pskeys.add(entry[0])
+            else:
+                i, num, mask = entry
+                flat[i] = num
+                cands[i] = mask
+        self.marked = snap.marked
+        self.pss = {size: list(sets) for size, sets in snap.pss.items()}
+        self.dirty = set(snap.dirty)
+        self.queue = deque(snap.queue)
+        self.unitqueue = set(snap.unitqueue)
+        self.techniques = set(snap.techniques)
+
+    def droptrail(self):
+        """stop logging changes (no snapshot can be restored after this)"""
+        self.trail = None
+
+    def _log(self, cells):
+        """add the current state of cells (a list of indexes) to the trail,
+        before they change"""
+        self.trail.extend(zip(cells, self.flat[cells].tolist(),
+                              self.cands[cells].tolist()))
+
+    def addlistener(self, listener):
+        """tell listener (an events.Listener) about everything we do"""
+        self.listeners.append(listener)
+
+    def removelistener(self, listener):
+        """stop telling listener about things"""
+        self.listeners.remove(listener)
+
+    def gettechniques(self):
+        """getter for the techniques used so far (sorted tuple)"""
+        return tuple(sorted(self.techniques))
+
+    def getnums(self):
+        """return (a copy of) the puzzle numbers as a 2D np.array"""
+        return self.board.copy()
+
+    @property
+    def cells(self):
+        """list of all cells (views of the board), row-major"""
+        if self._cells is None:
+            rowof = self.tables.rowof
+            colof = self.tables.colof
+            self._cells = [cell.Cell(rowof[i], colof[i], board=self.board)
+                           for i in range(self.tables.ncells)]
+        return self._cells
+
+    @property
+    def markups(self):
+        """list of all markups (views of cands), or [] if not marked"""
+        if not self.marked:
+            return []
+        if self._markups is None:
+            cells = self.cells
+            self._markups = [markup.Markup(0, cells[i], cands=self.cands,
+                                           index=i, maxnum=self.size)
+                             for i in range(self.tables.ncells)]
+        return self._markups
+
+    def _markup(self, i):
+        """Markup view of cell i (without making all of them)"""
+        if self._markups is not None:
+            return self._markups[i]
+        mycell = cell.Cell(self.tables.rowof[i], self.tables.colof[i],
+                           board=self.board)
+        return markup.Markup(0, mycell, cands=self.cands, index=i,
+                             maxnum=self.size)
 
     def __str__(self):
         """pretty-print the puzzle"""
-        ncols = 19
+        size = self.size
+        order = self.order
+        ncols = 2*size + 1
         pstr = "-"*ncols + "\n"
-        for row in range(9):
+        for row in range(size):
             strrow = "|"
-            for col in range(9):
+            for col in range(size):
                 divider = ":"
-                if col in (2, 5):
+                if col % order == order - 1 and col < size - 1:
                     divider = "|"
-                number = self.puzzle[row, col].getnum()
+                number = self.board[row, col]
                 if number == 0:
                     char = " " + divider
                 else:
-                    char = str(number) + divider
+                    char = SYMBOLS[number] + divider
                 strrow += char
             pstr += strrow + "\n"
-            if row in (2, 5):
+            if row % order == order - 1 and row < size - 1:
                 pstr += "-"*ncols + "\n"
         pstr += "-"*ncols + "\n"
         return pstr
@@ -59,167 +226,429 @@ class Puzzle():
         # e.g., if you have 126 in a preemptive box set, then you
         # can remove 1s 2s and 6s from the *other* markups in that box.
         # after this step, see if you have any singletons
-        for preset in self.pss:
-            # get the markups in this pss
-            psmarkups = preset.getmarkups()
-            # get all markups in this row, col, or box
-            row = psmarkups[0].getrow()
-            col = psmarkups[0].getcol()
-            ptype = preset.gettype()
-            if ptype == "row":
-                # get all row markups
-                marks = self._getrowmarkups(row, col)
-            elif ptype == "col":
-                # get all col markups
-                marks = self._getcolmarkups(row, col)
-            else:
-                # get all box markups
-                marks = self._getboxmarkups(row, col)
-            # now remove the pss markups, since we don't want
-            # to filter the numbers from themselves
-            self._rmmarks(psmarkups, marks)
-            # numbers in this preemptive set
-            nums = preset.getnums()
-            # now filter the numbers from the non-pss markups
-            for num in nums:
-                for mark in marks:
-                    mark.rmnum(num)
-
-    def _rmmarks(self, psmarkups, marks):
-        """remove the pss markups from the row/col/box markups"""
-        for m in psmarkups:
-            if m in marks:
-                marks.remove(m)
+        # markups only ever lose numbers, so once a set has been used
+        # it can't filter anything more: use each set once, then retire
+        # it (its key stays in pskeys so it isn't found again)
+        changes = 0
+        tables = self.tables
+        for size in sorted(self.pss):
+            for preset in self.pss[size]:
+                # numbers and cells in this preemptive set
+                mask = preset.getmask()
+                cellmask = preset.getcellmask()
+                # now filter the numbers from the non-pss markups
+                cands = self.cands
+                trail = self.trail
+                keep = self.all ^ mask
+                for i in tables.units[preset.getunit()]:
+                    if not (cellmask >> i) & 1 and cands[i] & mask:
+                        for listener in self.listeners:
+                            listener.eliminated(tables.rowof[i],
+                                                tables.colof[i],
+                                                int(cands[i] & mask), "pss")
+                        if trail is not None:
+                            trail.append((i, 0, int(cands[i])))
+                        cands[i] &= keep
+                        self._touch(i)
+                        changes += 1
+        self.pss = {}
+        if changes:
+            self.techniques.add("pss")
+        for listener in self.listeners:
+            listener.passdone("filtermarkups", changes)
+
+    def _touch(self, i):
+        """cell i's markup changed, so recheck it and its row, col, box"""
+        cellunits = self.tables.cellunits[i]
+        self.dirty.update(cellunits)
+        self.unitqueue.update(cellunits)
+        self.queue.append(i)
+
+    def propagate(self):
+        """place all the easy numbers that changes have led to
+
+        Works through the cells and units touched since last time:
+        a markup down to one number is a singleton, and a number that
+        fits in only one cell of a unit is forced.  Placing either one
+        touches more cells, which go on the end of the queue, until
+        nothing is left.  Returns False on a contradiction (an empty
+        cell with no numbers left, or a number with nowhere to go).
+        """
+        cands = self.cands
+        flat = self.flat
+        queue = self.queue
+        unitqueue = self.unitqueue
+        bits = self.bits
+        unitcells = self.tables.units
+        unitindex = self.tables.unitindex
+        while queue or unitqueue:
+            while queue:
+                i = queue.popleft()
+                if flat[i]:
+                    continue
+                mask = int(cands[i])
+                if mask == 0:
+                    return False
+                if mask & (mask - 1) == 0:
+                    self._place(i, mask.bit_length(), "singleton")
+            if unitqueue:
+                # hidden singles: numbers in just one markup of the unit
+                unit = unitqueue.pop()
+                index = unitindex[unit]
+                once = 0
+                twice = 0
+                for mask in cands[index].tolist():
+                    twice |= once & mask
+                    once |= mask
+                placed = 0
+                for num in flat[index].tolist():
+                    placed |= bits[num]
+                if once | placed != self.all:
+                    return False
+                hidden = once & ~twice & ~placed
+                while hidden:
+                    bit = hidden & -hidden
+                    hidden ^= bit
+                    for i in unitcells[unit]:
+                        if cands[i] & bit:
+                            self._place(i, bit.bit_length(), "forced")
+                            break
+        return True
+
+    def _place(self, i, num, technique):
+        """put num in cell i, and take it out of the peer markups"""
+        rowof = self.tables.rowof
+        colof = self.tables.colof
+        for listener in self.listeners:
+            listener.placed(rowof[i], colof[i], num, technique)
+        self.techniques.add(technique)
+        if self.trail is not None:
+            self.trail.append((i, int(self.flat[i]), int(self.cands[i])))
+        # set number in puzzle cell
+        self.flat[i] = num
+        # remove number from this markup
+        self.cands[i] = 0
+        self._touch(i)
+        # fix/check other markups in this box, row, col
+        bit = self.bits[num]
+        peers = self.tables.peerindex[i]
+        hits = peers[(self.cands[peers] & bit) != 0]
+        hitlist = hits.tolist()
+        if self.trail is not None:
+            self._log(hitlist)
+        self.cands[hits] &= self.all ^ bit
+        for j in hitlist:
+            self._touch(j)
+            for listener in self.listeners:
+                listener.eliminated(rowof[j], colof[j], bit, technique)
 
     def findpss(self):
-        """find preemptive sets"""
-        for i in range(len(self.markups)):
-            row = (i//9)
-            col = (i - (row*9))
-            n = len(self.markups[i])
-            if n > 0:
-                if n == 1:
-                    print("singleton!!", self.markups[i], row, col)
-                    num = self.markups[i].getnums()[0]
-                    # set number in puzzle cell
-                    self.puzzle[row, col].setnum(num)
-                    # remove number from this markup
-                    self.markups[i].rmnum(num)
-                    # fix/check other markups in this box, row, col
-                    marks = self._getrowmarkups(row, col)
-                    marks += self._getcolmarkups(row, col)
-                    marks += self._getboxmarkups(row, col)
-                    for m in marks:
-                        m.rmnum(num)
-                else:
-                    # print("check row for PS")
-                    self._checkforpresets(self._getrowmarkups, i, n, row, col, "row")
-                    self._checkforpresets(self._getcolmarkups, i, n, row, col, "col")
-                    self._checkforpresets(self._getboxmarkups, i, n, row, col, "box")
+        """find preemptive sets (and singletons)
 
-    def _checkforpresets(self, markupsfunction, i, n, row, col, pstype):
-        """helper to get preemptive sets for this row/col/box"""
-        count = 0
-        markset = set(self.markups[i].getnums())
-        marks = markupsfunction(row, col)
-        pset = preemptiveset.PreemptiveSet(pstype)
-        for m in marks:
-            if m != self.markups[i]:
-                if len(m) <= n:
-                    if set(m.getnums()).issubset(markset):
-                        pset.addmarkup(m)
-                        count += 1
-        if count == n-1:
-            # add self
-            pset.addmarkup(self.markups[i])
-            # and save (if not already in)
-            if pset not in self.pss:
-                self.pss.append(pset)
-                self.pss.sort(key=lambda x: x.size)
-        # ignore pss if size == number of non-empty markups in this row/col/box???
-
-    def _getboxmarkups(self, row, col):
-        """return all non-zero markup arrays for this box, but not myself"""
-        boxrow = (row)//3
-        boxcol = (col)//3
-        boxnum = boxrow * 3 + (boxcol + 1)
-        markups = []
-        start = (((boxnum - 1) // 3) * 27) + (((boxnum - 1) % 3) * 3)
-        indices = list(range(start, start+3)) \
-            + list(range(start+9, start+9+3)) \
-            + list(range(start+18, start+18+3))
-    #   print(boxnum, row, col, start, indices)
-        for i in indices:
-            if len(self.markups[i]) > 0:
-                markups.append(self.markups[i])
-        return markups
-
-    def _getrowmarkups(self, row, col):
-        """return all non-zero markup arrays for this row, but not myself"""
-        markups = []
-        for i in range(row*9, row*9 + 9):
-            if len(self.markups[i]) > 0:
-                if i % ((row+1)*9) != col:
-                    markups.append(self.markups[i])
-        return markups
-
-    def _getcolmarkups(self, row, col):
-        """return all non-zero markup arrays for this column, but not myself"""
-        markups = []
-        column = col % 9
-        indices = range(column, 81, 9)
-        for i in indices:
-            if len(self.markups[i]) > 0:
-                if (i//9) != row:
-                    markups.append(self.markups[i])
-        return markups
+        only rows/cols/boxes whose markups changed since the last call
+        can have anything new, so only those get checked
+        """
+        dirty = self.dirty
+        self.dirty = set()
+        cands = self.cands
+        tables = self.tables
+        placed = 0
+        found = len(self.pskeys)
+        for unit in sorted(dirty):
+            masks = cands[tables.unitindex[unit]].tolist()
+            for i, mask in zip(tables.units[unit], masks):
+                if mask.bit_count() == 1:
+                    # (re-read the mask: a singleton just placed may
+                    # have taken a number from this one)
+                    mask = int(cands[i])
+                    if mask.bit_count() == 1:
+                        self._place(i, mask.bit_length(), "singleton")
+                        placed += 1
+            self._checkforpresets(unit)
+        for listener in self.listeners:
+            # (singletons placed, plus new preemptive sets found)
+            listener.passdone("findpss", placed + len(self.pskeys) - found)
+
+    def _checkforpresets(self, unit):
+        """helper to get all preemptive sets for this row/col/box (see
+        _presets), and save the new ones"""
+        for setcells, cellmask, union in self._presets(unit, self.maxpssize):
+            key = (unit, cellmask, union)
+            if key in self.pskeys:
+                continue
+            self.pskeys.add(key)
+            if self.trail is not None:
+                self.trail.append((key,))
+            pset = preemptiveset.PreemptiveSet(self.tables.unittypes[unit],
+                                               unit)
+            for i in setcells:
+                pset.addmarkup(self._markup(i))
+            self.pss.setdefault(len(setcells), []).append(pset)
+            for listener in self.listeners:
+                listener.psfound(pset)
+
+    def _presets(self, unit, maxsize, cands=None):
+        """generator: (cells, cellmask, numbers mask) for each preemptive
+        set in this row/col/box that can filter something
+
+        a preemptive set is n markups whose numbers, all together,
+        are just n numbers (like 12, 23, 13).  Groups of markups are
+        built up one markup at a time (in order, so each group is only
+        made once), and a group is dropped as soon as it has more than
+        maxsize numbers, or more numbers than it could ever have
+        markups.  Sets go from 2 up to one less than the number of
+        markups in the unit (all of them is always a set).
+        """
+        if cands is None:
+            cands = self.cands
+        cells = []
+        masks = []
+        unitcells = self.tables.units[unit]
+        for i, mask in zip(unitcells,
+                           cands[self.tables.unitindex[unit]].tolist()):
+            if mask.bit_count() > 1:
+                cells.append(i)
+                masks.append(mask)
+        maxsize = min(maxsize, len(cells) - 1)
+        # only markups with maxsize or fewer numbers can be in a set
+        fits = [j for j in range(len(cells))
+                if masks[j].bit_count() <= maxsize]
+        # (next position in fits, numbers so far, markups so far)
+        groups = [(0, 0, ())]
+        while groups:
+            start, union, group = groups.pop()
+            for f in range(start, len(fits)):
+                j = fits[f]
+                newunion = union | masks[j]
+                count = newunion.bit_count()
+                if count > maxsize:
+                    continue
+                newgroup = group + (j,)
+                n = len(newgroup)
+                # each markup added can catch up by at most one
+                if count - n <= len(fits) - f - 1:
+                    groups.append((f + 1, newunion, newgroup))
+                if count != n or n < 2:
+                    continue
+                # only keep it if it can filter something
+                cellmask = 0
+                others = 0
+                for k in newgroup:
+                    cellmask |= 1 << cells[k]
+                for k in range(len(cells)):
+                    if not (cellmask >> cells[k]) & 1:
+                        others |= masks[k]
+                if not others & newunion:
+                    continue
+                yield [cells[k] for k in newgroup], cellmask, newunion
+
+    def hint(self):
+        """the next step, as a Hint (or None if there isn't one short
+        of search), without changing anything
+
+        The cheapest kind of step is looked for first, and the first
+        one found is it: a number that fits in just one cell of a box
+        (like findforced), or of a row or col; then a markup down to
+        one number; then a preemptive set of 2 markups that takes
+        numbers out of others, then of 3, and so on.  Works on the
+        markups as they are, or (before mark) as mark would make them.
+        """
+        tables = self.tables
+        size = self.size
+        cands = self.cands if self.marked else self._basemarkups()
+        flat = self.flat
+        # forced: numbers in just one markup of a unit, boxes first
+        order = list(range(2*size, 3*size)) + list(range(2*size))
+        masks = cands[tables.unitindex[order]]
+        placed = np.bitwise_or.reduce(self.bitarray[flat[
+            tables.unitindex[order]]], axis=1)
+        once = np.zeros(len(order), dtype=masks.dtype)
+        twice = np.zeros(len(order), dtype=masks.dtype)
+        for k in range(size):
+            twice |= once & masks[:, k]
+            once |= masks[:, k]
+        hidden = once & ~twice & ~placed
+        for u in np.flatnonzero(hidden).tolist():
+            unit = order[u]
+            bit = int(hidden[u]) & -int(hidden[u])
+            for i in tables.units[unit]:
+                if cands[i] & bit:
+                    return Hint("forced", self._unitname(unit),
+                                [(tables.rowof[i], tables.colof[i])],
+                                (bit.bit_length(),), [])
+        # singletons
+        single = (cands != 0) & ((cands & (cands - 1)) == 0) & (flat == 0)
+        for i in np.flatnonzero(single).tolist():
+            return Hint("singleton", None,
+                        [(tables.rowof[i], tables.colof[i])],
+                        (int(cands[i]).bit_length(),), [])
+        # preemptive sets, smallest first
+        for setsize in range(2, self.maxpssize + 1):
+            for unit in range(len(tables.units)):
+                for setcells, cellmask, union in self._presets(unit, setsize,
+                                                               cands):
+                    if len(setcells) != setsize:
+                        continue
+                    eliminations = [((tables.rowof[i], tables.colof[i]),
+                                     tuple(tonums(cands[i] & union)))
+                                    for i in tables.units[unit]
+                                    if not (cellmask >> i) & 1
+                                    and cands[i] & union]
+                    return Hint("pss", self._unitname(unit),
+                                [(tables.rowof[i], tables.colof[i])
+                                 for i in setcells],
+                                tuple(tonums(union)), eliminations)
+        return None
+
+    def _unitname(self, unit):
+        """("row", 3) for unit 3, ("col", 0) for unit size, ..."""
+        return self.tables.unittypes[unit], unit % self.size
 
     def mark(self):
-        """create the markups for this puzzle"""
+        """create the markups for this puzzle (from scratch: any
+        preemptive sets found before are forgotten, since what they
+        filtered out is back, and they can be found again)"""
         # for each cell: rm #s in row, col, box
-        for row in range(9):
-            for col in range(9):
-                newmarkup = markup.Markup()
-                newmarkup.setcell(self.puzzle[row, col])
-                if self.puzzle[row, col].getnum() == 0:
-                    rowcells = self.puzzle[row]
-                    colcells = self.puzzle[:, col]
-                    rownums = []
-                    for rcell in rowcells:
-                        rownums.append(rcell.getnum())
-                    colnums = []
-                    for ccell in colcells:
-                        colnums.append(ccell.getnum())
-                    boxrow = (row)//3
-                    boxcol = (col)//3
-                    boxnum = boxrow * 3 + (boxcol)
-                    boxnums = self._getboxnums(boxnum)
-                    for i in range(1, 10):
-                        if i not in rownums:
-                            if i not in colnums:
-                                if i not in boxnums:
-                                    newmarkup.addnum(i)
-                self.markups.append(newmarkup)
+        masks = batch.candidates(self.board[None], packed=True)
+        if self.trail is not None:
+            self._log(list(range(self.tables.ncells)))
+        self.cands[:] = masks.ravel()
+        self.marked = True
+        self.pss = {}
+        self._forget(self.pskeys)
+        nunits = len(self.tables.units)
+        self.dirty = set(range(nunits))
+        self.queue = deque(range(self.tables.ncells))
+        self.unitqueue = set(range(nunits))
+
+    def place(self, row, col, num):
+        """put num in cell row, col (for puzzle UIs, see also clear)
+
+        Whatever was in the cell is cleared first.  Once the puzzle is
+        marked up, num comes out of the markups it can see, and any
+        preemptive set in its row, col or box that hasn't been used
+        yet is dropped (it may not hold any more), all without
+        touching the rest of the puzzle.  num doesn't have to fit
+        (see conflicts).
+        """
+        i = self._index(row, col)
+        if not 1 <= num <= self.size:
+            raise ValueError("numbers go from 1 to %d" % self.size)
+        if self.flat[i]:
+            self.clear(row, col)
+        if not self.marked:
+            if self.trail is not None:
+                self._log([i])
+            self.flat[i] = num
+            return
+        self._droppss(self.tables.cellunits[i])
+        self._place(i, num, "user")
+        self._trimqueue()
+
+    def clear(self, row, col):
+        """take the number out of cell row, col (for puzzle UIs)
+
+        Once marked up, every markup is worked out again from the
+        numbers left in its row, col and box: the number comes back
+        wherever it fits now, and eliminations made by preemptive sets
+        are undone too, since any of them might have depended on it
+        (findpss finds the sets again).  Only the cells whose markups
+        changed are queued for the next propagate/findpss.
+        """
+        i = self._index(row, col)
+        if not self.flat[i]:
+            return
+        if self.trail is not None:
+            self._log([i])
+        self.flat[i] = 0
+        if not self.marked:
+            return
+        masks = self._basemarkups()
+        changed = np.flatnonzero(masks != self.cands).tolist()
+        if self.trail is not None:
+            self._log(changed)
+        self.cands[changed] = masks[changed]
+        self.pss = {}
+        self._forget(self.pskeys)
+        for j in changed:
+            self._touch(j)
+        self._trimqueue()
+
+    def conflicts(self):
+        """list of (row, col) of every number that is also somewhere
+        else in its row, col or box (empty if there are none)"""
+        unitindex = self.tables.unitindex
+        nums = self.flat[unitindex]
+        twice = (nums[:, :, None] == nums[:, None, :]).sum(axis=2) > 1
+        cells = np.unique(unitindex[twice & (nums != 0)]).tolist()
+        return [(self.tables.rowof[i], self.tables.colof[i]) for i in cells]
+
+    def _index(self, row, col):
+        """cell index for row, col (ValueError if off the board)"""
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            raise ValueError("no cell %s on a %dx%d board"
+                             % ((row, col), self.size, self.size))
+        return units.index(row, col, self.size)
+
+    def _basemarkups(self):
+        """markups from just the numbers in each row, col and box"""
+        placed = self.bitarray[self.flat]
+        used = np.bitwise_or.reduce(placed[self.tables.unitindex], axis=1)
+        seen = np.bitwise_or.reduce(used[self.tables.cellunitindex], axis=1)
+        masks = self.all ^ seen
+        masks[self.flat != 0] = 0
+        return masks
+
+    def _trimqueue(self):
+        """drop repeats from the queue, if it's getting long (a UI may
+        place and clear for a long time without a propagate)"""
+        if len(self.queue) > self.tables.ncells:
+            self.queue = deque(dict.fromkeys(self.queue))
+
+    def _droppss(self, unitlist):
+        """forget the unused preemptive sets in these units"""
+        dropped = []
+        for size in list(self.pss):
+            keep = []
+            for pset in self.pss[size]:
+                if pset.getunit() in unitlist:
+                    dropped.append((pset.getunit(), pset.getcellmask(),
+                                    pset.getmask()))
+                else:
+                    keep.append(pset)
+            self.pss[size] = keep
+        self._forget(dropped)
+        self.dirty.update(unitlist)
+
+    def _forget(self, keys):
+        """take these preemptive set keys out of pskeys, so the sets
+        can be found again (logged, so restore() puts them back)"""
+        keys = self.pskeys.intersection(keys)
+        if self.trail is not None:
+            self.trail.extend((key, True) for key in keys)
+        self.pskeys -= keys
 
     def showpreemptivesets(self):
         """pretty-print the preemptive sets"""
         print("current preemptive sets:")
-        for pss in self.pss:
-            print(pss)
+        for size in sorted(self.pss):
+            for pss in self.pss[size]:
+                print(pss)
 
     def showmarkup(self):
         """pretty-print the markup"""
-        ndash = 100
-        for row in range(9):
-            if row % 3 == 0:
+        size = self.size
+        order = self.order
+        width = size + 1
+        ndash = width*size + 3*order + 1
+        for row in range(size):
+            if row % order == 0:
                 print("-" * ndash)
             rowstr = ""
-            for col in range(9):
-                nums = self.markups[(9*row)+col].getnums()
-                arraystr = str(nums)
-                arraystr = arraystr.replace(", ", "")
-                rowstr += "%10s" % arraystr
-                if (col+1) % 3 == 0:
+            for col in range(size):
+                arraystr = "[%s]" % tostr(self.cands[(size*row)+col])
+                rowstr += "%*s" % (width, arraystr)
+                if (col+1) % order == 0:
                     rowstr += " ||"
             print(rowstr)
         print("-" * ndash)
@@ -227,98 +656,275 @@ class Puzzle():
     def findforced(self):
         """find and fill in all 'forced' numbers (the easy ones)"""
         numchanged = 0
-        for num in range(1, 10):  # actual num in puzzle, so 1-9
-            print("finding forced numbers...looking for %ds" % (num))
+        size = self.size
+        rowof = self.tables.rowof
+        colof = self.tables.colof
+        # (one list of the board for the whole pass, kept up to date)
+        nums = self.flat.tolist()
+        for num in range(1, size + 1):  # actual num in puzzle, so 1-size
+            # rows and cols that already have num
+            cells = np.flatnonzero(self.flat == num).tolist()
+            rows = {rowof[i] for i in cells}
+            cols = {colof[i] for i in cells}
             # check each box
-            for box in range(9):
-                boxnums = self._getboxnums(box)
+            for box in range(size):
+                boxnums = self._getboxnums(box, nums)
                 if num not in boxnums:
                     # find all possible positions num could be
                     # possible = cells with 0's in them, in this box
-                    possible = self._emptypositions(box)
-                    if len(possible) == 0:
-                        error = "uh oh..%d not in box (%d)" % (num, box+1)
-                        error += ", but no empty cells???"
-                        print(error)
+                    # (if there are none, some other number is in
+                    # this box twice, and valid() will say so)
+                    possible = self._emptypositions(box, nums)
                     # now check rows and cols,
                     # delete from possible if num found
-                    pcopy = possible[:]
-                    for row, col in pcopy:
-                        rowcells = self.puzzle[row]
-                        colcells = self.puzzle[:, col]
-                        rownums = []
-                        for rcell in rowcells:
-                            rownums.append(rcell.getnum())
-                        colnums = []
-                        for ccell in colcells:
-                            colnums.append(ccell.getnum())
-                        if num in rownums:
-                            possible.remove((row, col))
-                        elif num in colnums:
-                            possible.remove((row, col))
+                    # (num is not in this box, so checking the rows
+                    # and cols is the same as checking all peers)
+                    possible = [(row, col) for row, col in possible
+                                if row not in rows and col not in cols]
                     # if only 1 possible left, put num in that cell
                     if len(possible) == 1:
                         numchanged += 1
-                        print("FOUND: %d in %s" % (num, possible[0]))
-                        self.puzzle[possible[0][0], possible[0][1]].setnum(num)
+                        self.techniques.add("forced")
+                        if self.trail is not None:
+                            self._log([possible[0][0]*size + possible[0][1]])
+                        for listener in self.listeners:
+                            listener.placed(possible[0][0], possible[0][1],
+                                            num, "forced")
+                        self.board[possible[0]] = num
+                        nums[possible[0][0]*size + possible[0][1]] = num
+                        rows.add(possible[0][0])
+                        cols.add(possible[0][1])
+        for listener in self.listeners:
+            listener.passdone("findforced", numchanged)
         return numchanged
 
     def solved(self):
         """return True if puzzle is solved"""
-        for boxnum in range(9):
-            empties = self._emptypositions(boxnum)
-            if len(empties) > 0:
-                return False
         # if no empty positions left...
+        return bool(self.flat.all())
+
+    def valid(self):
+        """return False if the puzzle can't be solved as it stands"""
+        if self.flat.min() < 0 or self.flat.max() > self.size:
+            return False
+        # no number twice in a row/col/box (sorted, so twice is
+        # side by side)
+        nums = np.sort(self.flat[self.tables.unitindex], axis=1)
+        if ((nums[:, 1:] == nums[:, :-1]) & (nums[:, 1:] != 0)).any():
+            return False
+        # and (once marked up) every empty cell has something that fits
+        if self.marked:
+            if ((self.flat == 0) & (self.cands == 0)).any():
+                return False
         return True
 
-    def _emptypositions(self, boxnum):
-        """return list of empty positions in this box"""
-        posns = []
-        if boxnum < 3:
-            rows = [0, 1, 2]
-        elif boxnum < 6:
-            rows = [3, 4, 5]
-        else:
-            rows = [6, 7, 8]
-        if boxnum in [0, 3, 6]:
-            cols = [0, 1, 2]
-        elif boxnum in [1, 4, 7]:
-            cols = [3, 4, 5]
-        else:
-            cols = [6, 7, 8]
-        for row in rows:
-            for col in cols:
-                if self.puzzle[row, col].getnum() == 0:
-                    posns.append((row, col))
-        return posns
-
-    def _getboxnums(self, boxnum):
-        """get all numbers in the box, return as array"""
-        if boxnum < 3:
-            rstart = 0
-            rend = 3
-        elif boxnum < 6:
-            rstart = 3
-            rend = 6
-        else:
-            rstart = 6
-            rend = 9
-        if boxnum in [0, 3, 6]:
-            cstart = 0
-            cend = 3
-        elif boxnum in [1, 4, 7]:
-            cstart = 3
-            cend = 6
-        else:
-            cstart = 6
-            cend = 9
-        cells = self.puzzle[rstart:rend, cstart:cend]
-        nums = []
-        for row in cells:
-            for rowcell in row:
-                nums.append(rowcell.getnum())
-        return nums
+    def solve(self, search=True, maxnodes=10000, timeout=None):
+        """run the whole algorithm, return SOLVED, STALLED or INVALID
+
+        if the preemptive sets get stuck and search is True, finish
+        off with search(maxnodes, timeout)
+        """
+        if not self.valid():
+            return INVALID
+        while self._timed("findforced", self.findforced) > 0:
+            pass
+        self._timed("mark", self.mark)
+        status = self._runpss()
+        if status == STALLED and search:
+            status = self._timed("search", self.search, maxnodes, timeout)
+            self.techniques.add("search")
+        return status
+
+    def _timed(self, name, step, *args):
+        """return step(*args), and if phases is a dict (see bench.py),
+        add the time it took to phases[name]"""
+        if self.phases is None:
+            return step(*args)
+        start = time.perf_counter()
+        try:
+            return step(*args)
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+    def _runpss(self):
+        """propagate, then findpss/filtermarkups, until solved, stuck,
+        or broken"""
+        while self.valid() and not self.solved():
+            if not self._timed("propagate", self.propagate):
+                return INVALID
+            if self.solved():
+                break
+            self._timed("findpss", self.findpss)
+            self._timed("filtermarkups", self.filtermarkups)
+            if not self.dirty:
+                # nothing changed, so the next pass would find nothing new
+                return STALLED
+        if not self.valid():
+            return INVALID
+        return SOLVED
+
+    def search(self, maxnodes=10000, timeout=None):
+        """finish a stuck (marked-up) puzzle by trial and error
+
+        Crook's paper ends with a random choice when no preemptive
+        set helps.  Here we pick the markup with the fewest numbers,
+        try each one (from a snapshot of the puzzle), run the
+        preemptive sets on that, and back up (restore the snapshot) if
+        it leads to a contradiction.  Gives up (STALLED) after trying
+        maxnodes numbers, or after timeout seconds (if given).
+        """
+        nodes = [maxnodes]
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        ownstrail = self.trail is None
+        # (the steps inside search all count as search time)
+        phases, self.phases = self.phases, None
+        try:
+            status = self._search(nodes, deadline)
+        finally:
+            self.phases = phases
+        if ownstrail:
+            self.droptrail()
+        return status
+
+    def _search(self, nodes, deadline=None):
+        """helper for search, returns the status (SOLVED leaves the
+        solution in the puzzle, anything else leaves it as it was
+        after the first _runpss)
+
+        The guesses are kept on a stack of (snapshot, cell, numbers
+        still to try), not in python's own stack: a big board can need
+        more guesses in a row than python allows recursive calls.
+        """
+        status = self._runpss()
+        if status != STALLED:
+            return status
+        stack = [self._guesses()]
+        while stack:
+            snap, i, nums = stack[-1]
+            num = next(nums, None)
+            if num is None:
+                # nothing fits here, so some earlier choice was wrong
+                stack.pop()
+                continue
+            self.restore(snap)
+            nodes[0] -= 1
+            if nodes[0] < 0 or (deadline is not None
+                                and time.monotonic() > deadline):
+                self.restore(stack[0][0])
+                return STALLED
+            self._place(i, num, "search")
+            status = self._runpss()
+            if status == SOLVED:
+                return status
+            if status == STALLED:
+                stack.append(self._guesses())
+        self.restore(snap)
+        return INVALID
+
+    def _guesses(self):
+        """a snapshot of a stalled puzzle, the cell to branch on (the
+        smallest markup), and an iterator over its numbers"""
+        i = self._bestcell()
+        return self.snapshot(), i, iter(tonums(self.cands[i]))
+
+    def _bestcell(self):
+        """the empty cell with the fewest numbers in its markup"""
+        best = None
+        bestsize = self.size + 1
+        for i, mask in enumerate(self.cands.tolist()):
+            if 1 < mask.bit_count() < bestsize:
+                best = i
+                bestsize = mask.bit_count()
+                if bestsize == 2:
+                    break
+        return best
+
+    def countsolutions(self, limit=2, maxnodes=10000, timeout=None):
+        """count the solutions, stopping as soon as there are limit
+
+        So countsolutions() is 0 (no solution), 1 (unique), or 2
+        (more than one).  Same steps as solve() and search(), but
+        every branch is tried instead of stopping at the first
+        solution.  Like search(), it gives up after trying maxnodes
+        numbers, or after timeout seconds (if given), and then returns
+        None: the count isn't known.  The puzzle is left as it was.
+        """
+        nodes = [maxnodes]
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        ownstrail = self.trail is None
+        snap = self.snapshot()
+        count = 0
+        if self.valid():
+            while self.findforced() > 0:
+                pass
+            self.mark()
+            count = self._count(limit, nodes, deadline)
+        self.restore(snap)
+        if ownstrail:
+            self.droptrail()
+        return count
+
+    def _count(self, limit, nodes, deadline=None):
+        """helper for countsolutions (None if it ran out of nodes or
+        time), with a stack of guesses like _search"""
+        status = self._runpss()
+        if status == INVALID:
+            return 0
+        if status == SOLVED:
+            return 1
+        count = 0
+        stack = [self._guesses()]
+        while stack:
+            snap, i, nums = stack[-1]
+            num = next(nums, None)
+            if num is None:
+                stack.pop()
+                continue
+            self.restore(snap)
+            nodes[0] -= 1
+            if nodes[0] < 0 or (deadline is not None
+                                and time.monotonic() > deadline):
+                return None
+            self._place(i, num, "search")
+            status = self._runpss()
+            if status == SOLVED:
+                count += 1
+                if count >= limit:
+                    break
+            elif status == STALLED:
+                stack.append(self._guesses())
+        return count
+
+    def getstate(self):
+        """the numbers, markups and preemptive sets found, of a stalled
+        puzzle: small enough to send to another process (see setstate)"""
+        return self.board.copy(), self.cands.copy(), frozenset(self.pskeys)
+
+    def setstate(self, state):
+        """pick up where getstate() left off (same board order), with
+        nothing left to check, as if this puzzle had just stalled"""
+        board, cands, pskeys = state
+        self.setnums(board)
+        self.cands[:] = cands
+        self.marked = True
+        self.pskeys = set(pskeys)
+
+    def _emptypositions(self, boxnum, nums):
+        """return list of empty positions in this box (nums is
+        flat.tolist())"""
+        rowof = self.tables.rowof
+        colof = self.tables.colof
+        return [(rowof[i], colof[i]) for i in self.tables.boxes[boxnum]
+                if nums[i] == 0]
+
+    def _getboxnums(self, boxnum, nums):
+        """get all numbers in the box (nums is flat.tolist()), return
+        as list"""
+        return [nums[i] for i in self.tables.boxes[boxnum]]
 
 ############################################
 
@@ -336,7 +942,7 @@ def main():
                      [0, 3, 9, 0, 0, 0, 8, 0, 0],
                      [4, 7, 0, 0, 1, 0, 3, 9, 0],
                      [8, 5, 0, 0, 3, 9, 6, 0, 4]])
-    puzz1 = Puzzle()
+    puzz1 = Puzzle(verbose=True)
     puzz1.setnums(easy)
     print(puzz1)
     done = False
@@ -356,7 +962,7 @@ def main():
                        [0, 0, 6, 7, 0, 8, 2, 0, 0],
                        [0, 1, 0, 0, 9, 0, 0, 0, 5],
                        [0, 0, 0, 0, 0, 1, 0, 0, 8]])
-    puzz2 = Puzzle()
+    puzz2 = Puzzle(verbose=True)
     puzz2.setnums(shortz)
     print(puzz2)
     done = False
@@ -383,7 +989,7 @@ def main():
         puzz2.showmarkup()
     print(puzz2)
 
-# two that don't solve yet...
+# two where the preemptive sets get stuck, so search finishes them
     diabolical = np.array([[0, 9, 0, 7, 0, 0, 8, 6, 0],
                            [0, 3, 1, 0, 0, 5, 0, 2, 0],
                            [8, 0, 6, 0, 0, 0, 0, 0, 0],
@@ -393,28 +999,13 @@ def main():
                            [0, 0, 0, 0, 0, 0, 1, 0, 9],
                            [0, 2, 0, 6, 0, 0, 3, 5, 0],
                            [0, 5, 4, 0, 0, 8, 0, 7, 0]])
-    puzz3 = Puzzle()
+    puzz3 = Puzzle(verbose=True)
     puzz3.setnums(diabolical)
     print(puzz3)
-    """
-    done = False
-    while not done:
-        numchanged = puzz3.findforced()
-        if numchanged == 0:
-            done = True
-    print(puzz3)
-    print("solved?", puzz3.solved())
-    print("creating puzzle markup...")
-    puzz3.mark()
-    puzz3.showmarkup()
-    while not puzz3.solved():
-        print(puzz3)
-        puzz3.findpss()
-        puzz3.showpreemptivesets()
-        puzz3.filtermarkups()
-        puzz3.showmarkup()
+    print("solving...")
+    status = puzz3.solve()
     print(puzz3)
-    """
+    print(status)
 
     beach = np.array([[0, 0, 0, 0, 0, 0, 0, 0, 1],
                       [0, 0, 7, 0, 0, 3, 8, 0, 0],
@@ -425,28 +1016,139 @@ def main():
                       [0, 4, 0, 0, 8, 0, 0, 0, 2],
                       [0, 0, 9, 5, 0, 0, 1, 0, 0],
                       [3, 0, 0, 0, 0, 0, 0, 0, 9]])
-    puzz4 = Puzzle()
+    puzz4 = Puzzle(verbose=True)
     puzz4.setnums(beach)
     print(puzz4)
-    """
-    done = False
-    while not done:
-        numchanged = puzz4.findforced()
-        if numchanged == 0:
-            done = True
-    print(puzz4)
-    print("solved?", puzz4.solved())
-    print("creating puzzle markup...")
-    puzz4.mark()
-    puzz4.showmarkup()
-    while not puzz4.solved():
-        print(puzz4)
-        puzz4.findpss()
-        puzz4.showpreemptivesets()
-        puzz4.filtermarkups()
-        puzz4.showmarkup()
+    print("solving...")
+    status = puzz4.solve()
     print(puzz4)
-    """
+    print(status)
+
+# step by step, with a snapshot to go back to
+    puzz6 = Puzzle()
+    puzz6.setnums(shortz)
+    puzz6.mark()
+    snap = puzz6.snapshot()
+    before = (puzz6.getnums(), puzz6.cands.copy())
+    while not puzz6.solved():
+        puzz6.propagate()
+        puzz6.findpss()
+        puzz6.filtermarkups()
+    print("stepped to the end, with %d changes logged" % len(puzz6.trail))
+    puzz6.restore(snap)
+    assert (puzz6.getnums() == before[0]).all()
+    assert (puzz6.cands == before[1]).all()
+    print("...and back:")
+    print(puzz6)
+
+# a 16x16 board (order 4), numbers past 9 are letters
+    big = ["..F....G3.....B.",
+           "..E..D.AC4...2.1",
+           "....C.B792F.....",
+           "C.B.92.185E..D6.",
+           "4B7....8...3....",
+           "D6..4.79..18.E.3",
+           "2..8.EG.D.....79",
+           "..G.D..C4B.9.F..",
+           ".3.6AC4B.....85.",
+           "1.5E.3.6A...792.",
+           "792.1......6.C.B",
+           "..4.792.1.5EG...",
+           ".18.EG.D6.C4B.92",
+           "B7.2F1..E.3D...4",
+           "...D6........18.",
+           ".A....9..18..G.D"]
+    puzz5 = Puzzle(order=4)
+    puzz5.setnums([[SYMBOLS.find(char) if char != "." else 0
+                    for char in row] for row in big])
+    print(puzz5)
+    print("solving...")
+    status = puzz5.solve()
+    print(puzz5)
+    print(status, puzz5.gettechniques())
+
+# a puzzle UI: put numbers in and take them out again
+    puzz7 = Puzzle()
+    puzz7.setnums(shortz)
+    puzz7.solve()
+    answer = puzz7.getnums()
+    puzz7.setnums(shortz)
+    while puzz7.findforced() > 0:
+        pass
+    puzz7.mark()
+    puzz7.findpss()
+    puzz7.filtermarkups()
+    filled = puzz7.getnums()
+    puzz7.place(4, 4, 5)
+    assert puzz7.board[4, 4] == 5 and not puzz7.cands[40]
+    assert not any(puzz7.cands[j] & puzz7.bits[5] for j in units.PEERS[40])
+    puzz7.place(0, 0, 3)
+    print("conflicts:", puzz7.conflicts())
+    assert puzz7.conflicts() == [(0, 0), (0, 1)]
+    puzz7.clear(0, 0)
+    puzz7.clear(4, 4)
+    assert puzz7.conflicts() == []
+    assert (puzz7.getnums() == filled).all()
+    fresh = Puzzle()
+    fresh.setnums(filled)
+    fresh.mark()
+    assert (puzz7.cands == fresh.cands).all()
+    # (and a snapshot from before comes back just as it was)
+    snap = puzz7.snapshot()
+    keys = set(puzz7.pskeys)
+    puzz7.place(0, 0, 7)
+    puzz7.clear(0, 0)
+    puzz7.restore(snap)
+    puzz7.droptrail()
+    assert puzz7.pskeys == keys and (puzz7.getnums() == filled).all()
+    puzz7.place(0, 0, 7)
+    puzz7.place(0, 0, answer[0, 0])
+    assert puzz7.solve(search=False) == SOLVED
+    assert (puzz7.getnums() == answer).all()
+
+# marking up again starts the preemptive sets over too
+    puzz9 = Puzzle()
+    puzz9.setnums(shortz)
+    puzz9.mark()
+    puzz9.propagate()
+    puzz9.findpss()
+    puzz9.filtermarkups()
+    puzz9.mark()
+    assert puzz9._runpss() == SOLVED
+    assert (puzz9.getnums() == answer).all()
+    puzz9.setnums(shortz)
+    puzz9.mark()
+    puzz9.propagate()
+    puzz9.findpss()
+    puzz9.filtermarkups()
+    assert puzz9.solve(search=False) == SOLVED
+    assert "search" not in puzz9.gettechniques()
+
+# hints, one step at a time (and nothing changes until they are used)
+    puzz8 = Puzzle()
+    puzz8.setnums(shortz)
+    print(puzz8.hint())
+    assert not puzz8.marked
+    puzz8.mark()
+    steps = {}
+    while not puzz8.solved():
+        before = puzz8.cands.copy()
+        step = puzz8.hint()
+        assert (puzz8.cands == before).all()
+        steps[step.technique] = steps.get(step.technique, 0) + 1
+        if step.technique == "pss":
+            for (row, col), nums in step.eliminations:
+                assert answer[row, col] not in nums
+                puzz8.cands[row*9 + col] &= puzz8.all ^ tomask(nums)
+        else:
+            (row, col), = step.cells
+            assert answer[row, col] == step.nums[0]
+            puzz8.place(row, col, step.nums[0])
+    print("hints:", steps)
+    assert steps["pss"] > 0
+    puzz8.setnums(diabolical)
+    puzz8.solve(search=False)
+    assert puzz8.hint() is None
 
 if __name__ == "__main__":
     main()
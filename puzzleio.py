@@ -0,0 +1,124 @@
+"""
+read and write sudoku puzzles, one per line
+
+Input lines are 81 characters, row by row, with 0 or . for blanks
+(blank lines and lines starting with # are skipped).  Output lines
+are the 81-character solution (0 for anything still blank), a space,
+and the status from Puzzle.solve().
+
+Bigger boards are one line too: 256 characters for 16x16, 625 for
+25x25, with numbers past 9 as letters (1-9, then A, B, ...).
+
+Everything streams: one line in, one line out, so the size of the
+input file doesn't matter.
+
+Oct 2026
+"""
+
+import sys
+import io
+
+import numpy as np
+import puzzle
+import solver
+from bitset import SYMBOLS
+from units import orderof
+
+
+def parse(line):
+    """turn one 81-character line into a 9x9 np.array of nums
+    (or a 256-character line into 16x16, ...)"""
+    line = line.strip().replace(".", "0")
+    if len(line) == 81 and line.isdigit():
+        nums = np.frombuffer(line.encode("ascii"), dtype=np.uint8) - ord("0")
+        return nums.astype(np.int8).reshape(9, 9)
+    size = int(round(len(line) ** 0.5))
+    if size * size != len(line) or not orderof(size) or size == 9:
+        raise ValueError("not a sudoku puzzle: %r" % line)
+    nums = [SYMBOLS.find(char) for char in line]
+    if min(nums) < 0 or max(nums) > size:
+        raise ValueError("not a sudoku puzzle: %r" % line)
+    return np.array(nums, dtype=np.int8).reshape(size, size)
+
+
+def tostring(nums):
+    """turn a 9x9 array of nums into an 81-character line (or 16x16
+    into 256 characters, ...)"""
+    nums = np.asarray(nums)
+    if nums.ndim != 2 or nums.shape[0] != nums.shape[1] \
+            or not orderof(nums.shape[0]):
+        return "0" * 81
+    return "".join(SYMBOLS[n] for n in nums.ravel().tolist())
+
+
+def readpuzzles(lines):
+    """generator: yield a 9x9 np.array for each puzzle line
+
+    lines can be an open file or any iterable of strings.  Lines that
+    aren't puzzles are yielded as None (which solves as INVALID), so
+    output lines still match up with input lines.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            yield parse(line)
+        except ValueError:
+            yield None
+
+
+def writesolutions(outfile, results):
+    """write one line per solver Result, return how many were written"""
+    count = 0
+    for result in results:
+        outfile.write("%s %s\n" % (tostring(result.solution), result.status))
+        count += 1
+    return count
+
+
+def solvefile(infile, outfile, workers=None, chunksize=32):
+    """stream puzzles from infile through the solver into outfile"""
+    puzzles = readpuzzles(infile)
+    results = solver.solve_many(puzzles, workers=workers,
+                                chunksize=chunksize, ordered=True)
+    return writesolutions(outfile, results)
+
+
+def main():
+    """solve a file (puzzleio.py infile outfile, - for stdin/stdout),
+    or with no args run some minimal tests"""
+    if len(sys.argv) == 3:
+        infile = sys.stdin if sys.argv[1] == "-" else open(sys.argv[1])
+        outfile = sys.stdout if sys.argv[2] == "-" else open(sys.argv[2], "w")
+        with infile, outfile:
+            solvefile(infile, outfile)
+        return
+    text = ("# shortz, twice, and a bad line\n"
+            ".395........8...7.....1.9.41..4....3....."
+            "......7...86...67.82...1..9...5.....1..8\n"
+            "03950000000080007000001090410040000300000"
+            "0000007000860006708200010090005000001008\n"
+            "not a puzzle\n")
+    puzzles = list(readpuzzles(io.StringIO(text)))
+    assert len(puzzles) == 3
+    assert (puzzles[0] == puzzles[1]).all()
+    assert puzzles[2] is None
+    out = io.StringIO()
+    count = solvefile(io.StringIO(text), out, workers=1)
+    print(out.getvalue(), end="")
+    lines = out.getvalue().splitlines()
+    assert count == 3
+    assert lines[0] == lines[1]
+    assert lines[0].endswith(puzzle.SOLVED)
+    assert lines[2].endswith(puzzle.INVALID)
+    assert parse(lines[0].split()[0]).all()
+    small = parse("1004" "0010" "2100" "4001")
+    assert small.shape == (4, 4) and tostring(small) == "1004001021004001"
+    big = parse("G" + "." * 255)
+    assert big[0, 0] == 16 and tostring(big) == "G" + "0" * 255
+    print("all ok")
+
+
+if __name__ == "__main__":
+    main()
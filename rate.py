@@ -0,0 +1,215 @@
+"""
+rate sudoku puzzles by the hardest technique they need
+
+Each puzzle goes through the solver's stages, moving on to the next
+one only when everything before it is stuck:
+
+    level 0     findforced alone
+    level 1     singletons (and numbers forced in a row/col/box)
+    level k     preemptive sets of up to k numbers (2-8)
+    level 9     search
+
+and its level is the deepest stage that made any progress.  With it
+go the counts from an events.CountListener: numbers placed and
+eliminated by each technique, preemptive sets found, and passes run.
+
+This is for rating a whole catalog: each worker process reuses one
+Puzzle (and one listener) for every puzzle, nothing is printed, and
+each rating is one flat row (see COLUMNS), written out as CSV.
+
+    python3 rate.py puzzles.txt ratings.csv
+
+Oct 2026
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+import events
+import puzzle
+import puzzleio
+import solver
+
+FORCED = 0
+SINGLETON = 1
+SEARCH = puzzle.MAXPSSIZE + 1
+
+TECHNIQUES = ["forced", "singleton", "pss", "search"]
+PASSES = ["findforced", "findpss", "filtermarkups"]
+COLUMNS = (["index", "status", "level"]
+           + ["placed_" + t for t in TECHNIQUES]
+           + ["removed_" + t for t in TECHNIQUES]
+           + ["presets"]
+           + ["passes_" + p for p in PASSES])
+
+Rating = namedtuple("Rating", COLUMNS)
+
+# board order -> (Puzzle, CountListener), made once per process
+_raters = {}
+
+
+def _rater(order):
+    """the Puzzle (with a CountListener) used to rate boards of order"""
+    if order not in _raters:
+        puzz = puzzle.Puzzle(order=order)
+        counter = events.CountListener()
+        puzz.addlistener(counter)
+        _raters[order] = (puzz, counter)
+    return _raters[order]
+
+
+def rate(nums, index=0, maxnodes=10000):
+    """rate one puzzle (size x size nums), return a Rating"""
+    nums = np.asarray(nums)
+    order = solver._boardorder(nums)
+    if not order:
+        return Rating(index, puzzle.INVALID, FORCED,
+                      *[0] * (len(COLUMNS) - 3))
+    puzz, counter = _rater(order)
+    puzz.setnums(nums)
+    counter.reset()
+    status, level = _stages(puzz, maxnodes)
+    placements = counter.placements
+    eliminations = counter.eliminations
+    passes = counter.passes
+    return Rating(index, status, level,
+                  *[placements.get(t, 0) for t in TECHNIQUES],
+                  *[eliminations.get(t, 0) for t in TECHNIQUES],
+                  sum(counter.presets.values()),
+                  *[passes.get(p, 0) for p in PASSES])
+
+
+def _stages(puzz, maxnodes):
+    """Puzzle.solve, one stage at a time: return (status, level)"""
+    if not puzz.valid():
+        return puzzle.INVALID, FORCED
+    while puzz.findforced() > 0:
+        pass
+    if puzz.solved():
+        return puzzle.SOLVED, FORCED
+    level = FORCED
+    puzz.mark()
+    maxpssize = puzz.maxpssize
+    nunits = len(puzz.tables.units)
+    try:
+        while puzz.valid():
+            placed = np.count_nonzero(puzz.flat)
+            if not puzz.propagate():
+                return puzzle.INVALID, level
+            if np.count_nonzero(puzz.flat) > placed:
+                level = max(level, SINGLETON)
+            if puzz.solved():
+                return puzzle.SOLVED, level
+            # smallest preemptive sets first, bigger only if they fail
+            for size in range(2, maxpssize + 1):
+                puzz.maxpssize = size
+                puzz.findpss()
+                puzz.filtermarkups()
+                if puzz.dirty:
+                    level = max(level, size)
+                    break
+                # (every unit has been checked for sets this small, but
+                # not for bigger ones)
+                puzz.dirty = set(range(nunits))
+            else:
+                return puzz.search(maxnodes), SEARCH
+        return puzzle.INVALID, level
+    finally:
+        puzz.maxpssize = maxpssize
+
+
+def _ratechunk(chunk):
+    """worker: rate a list of (index, nums), return list of Ratings"""
+    return [rate(nums, index) for index, nums in chunk]
+
+
+def rate_many(puzzles, workers=None, chunksize=64, ordered=True):
+    """rate an iterable of puzzles, yielding a Rating for each one
+    (workers, chunksize and ordered are as in solver.solve_many)"""
+    return solver._mapchunks(_ratechunk, solver._chunks(puzzles, chunksize),
+                             workers, ordered)
+
+
+def writeratings(outfile, ratings):
+    """write Ratings as CSV (with a header line), return how many"""
+    writer = csv.writer(outfile, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    count = 0
+    for rating in ratings:
+        writer.writerow(rating)
+        count += 1
+    return count
+
+
+def _tests():
+    """minimal tests for the rater"""
+    shortz = "039500000000800070000010904100400003000000000007000860006708" \
+        "200010090005000001008"
+    easy = "003020600900305001001806400008102900700000008006708200002609500" \
+        "800203009005010300"
+    rating = rate(puzzleio.parse(shortz))
+    print(rating)
+    assert rating.status == puzzle.SOLVED and 2 <= rating.level < SEARCH
+    assert rating.removed_pss > 0 and rating.presets > 0
+    placed = rating.placed_forced + rating.placed_singleton
+    assert placed == shortz.count("0")
+    rating = rate(puzzleio.parse(easy), 1)
+    assert rating.level == FORCED and rating.status == puzzle.SOLVED
+    assert rating.passes_findpss == 0
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "corpus", "stall.txt")) as infile:
+        stall = [nums for nums in puzzleio.readpuzzles(infile)
+                 if nums is not None][:4]
+    for nums in stall:
+        rating = rate(nums)
+        assert rating.level == SEARCH and rating.status == puzzle.SOLVED
+    # the shared Puzzle and listener start fresh each time
+    assert rate(puzzleio.parse(easy)) == rate(puzzleio.parse(easy))
+    assert rate(None).status == puzzle.INVALID
+    bad = puzzleio.parse("11" + shortz[2:])
+    assert rate(bad).status == puzzle.INVALID
+    small = rate(puzzleio.parse("1004" "0010" "2100" "4001"))
+    assert small.status == puzzle.SOLVED
+    puzzles = [puzzleio.parse(shortz), puzzleio.parse(easy)] + stall
+    ratings = list(rate_many(puzzles, workers=2, chunksize=2))
+    assert ratings == list(rate_many(puzzles, workers=1))
+    assert [r.index for r in ratings] == list(range(len(puzzles)))
+    out = io.StringIO()
+    assert writeratings(out, ratings) == len(puzzles)
+    lines = out.getvalue().splitlines()
+    print(lines[0])
+    print(lines[1])
+    assert lines[0].split(",") == COLUMNS
+    print("all ok")
+
+
+def main():
+    """rate a file (rate.py infile outfile, - for stdin/stdout), or
+    with no args run some minimal tests"""
+    if len(sys.argv) == 1:
+        _tests()
+        return
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("infile", help="puzzles, one per line (see "
+                        "puzzleio.py)")
+    parser.add_argument("outfile", nargs="?", default="-",
+                        help="where to write the CSV (default: stdout)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunksize", type=int, default=64)
+    args = parser.parse_args()
+
+    infile = sys.stdin if args.infile == "-" else open(args.infile)
+    outfile = sys.stdout if args.outfile == "-" else open(args.outfile, "w",
+                                                          newline="")
+    with infile, outfile:
+        writeratings(outfile, rate_many(puzzleio.readpuzzles(infile),
+                                        args.workers, args.chunksize))
+
+
+if __name__ == "__main__":
+    main()
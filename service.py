@@ -0,0 +1,368 @@
+"""
+solve puzzles over the network (asyncio, stdlib only)
+
+Puzzles go into a bounded queue, and a few dispatcher tasks hand them
+to a pool of worker processes, so no solving ever happens in the event
+loop.  When the queue is full, new puzzles are turned away right away
+(HTTP 503, or "busy") instead of piling up.  Each request has a time
+budget: time spent waiting in the queue counts against it, the worker
+gets whatever is left (search gives up when it runs out), and the
+client gets an answer (HTTP 504, or "timeout") when it is used up.
+
+Two ways to talk to it, on the same port:
+
+    HTTP    POST /solve    body is a puzzle line (see puzzleio.py),
+                           or JSON {"puzzle": line, "budget": seconds};
+                           ?budget=seconds works too
+            GET /metrics   queue depth, counts, and latency, as JSON
+    lines   send puzzle lines, get back "solution status" lines (the
+            same format as puzzleio.py, with status "busy" or
+            "timeout" when it couldn't be solved in time)
+
+    python3 service.py 8080       # serve on localhost:8080
+
+Oct 2026
+"""
+
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import puzzle
+import puzzleio
+import solver
+from bench import percentile
+
+BUSY = "busy"
+TIMEOUT = "timeout"
+# latency percentiles are over this many recent requests
+LATENCYWINDOW = 1000
+# biggest HTTP body accepted (a 25x25 puzzle is 625 characters)
+MAXBODY = 64 * 1024
+
+Job = namedtuple("Job", ["nums", "start", "deadline", "future"])
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class SolveService():
+    """bounded queue of puzzles in front of a process pool"""
+
+    def __init__(self, workers=None, maxqueue=64, budget=5.0):
+        """workers processes (default one per cpu), at most maxqueue
+        puzzles waiting, and budget seconds per request by default"""
+        self.workers = workers or os.cpu_count() or 1
+        self.maxqueue = maxqueue
+        self.budget = budget
+        self.queue = None        # made in start(), inside the event loop
+        self.pool = None
+        self.server = None
+        self.tasks = []
+        self.busy = 0            # puzzles in the worker processes now
+        self.counts = {}         # status (or busy/timeout) -> requests
+        self.latency = deque(maxlen=LATENCYWINDOW)   # seconds, finished
+        self.waits = deque(maxlen=LATENCYWINDOW)     # seconds in queue
+
+    def __repr__(self):
+        """every class should have a repr"""
+        return "%s(%d, %d, %g)" % (self.__class__.__name__, self.workers,
+                                   self.maxqueue, self.budget)
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """start the workers and listen on host, port (0 picks a free
+        port: see getport)"""
+        self.queue = asyncio.Queue(self.maxqueue)
+        # (workers are started as they are needed, and forked ones would
+        # get a copy of every open connection, which then never closes)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"))
+        self.tasks = [asyncio.create_task(self._dispatch())
+                      for _ in range(self.workers)]
+        self.server = await asyncio.start_server(self._client, host, port)
+
+    def getport(self):
+        """the port we are listening on"""
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """stop listening, and shut down the workers"""
+        self.server.close()
+        await self.server.wait_closed()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def solve(self, nums, budget=None):
+        """solve nums in a worker, return (status, solution, techniques)
+
+        status is BUSY (queue full, nothing done) or TIMEOUT (budget
+        used up) if it couldn't be solved in time, and solver.ERROR if
+        the worker failed
+        """
+        start = time.monotonic()
+        if budget is None:
+            budget = self.budget
+        job = Job(nums, start, start + budget,
+                  asyncio.get_running_loop().create_future())
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return self._count(BUSY, nums, start)
+        try:
+            # (shielded, so giving up doesn't cancel it under the
+            # dispatcher, which just skips it if it hasn't started)
+            result = await asyncio.wait_for(asyncio.shield(job.future),
+                                            budget)
+        except asyncio.TimeoutError:
+            job.future.cancel()
+            return self._count(TIMEOUT, nums, start)
+        except Exception:
+            # (a worker that died, or nums it couldn't be sent)
+            return self._count(solver.ERROR, nums, start)
+        self.latency.append(time.monotonic() - start)
+        self.counts[result[0]] = self.counts.get(result[0], 0) + 1
+        return result
+
+    def _count(self, status, nums, start):
+        """record a request that wasn't solved, and say so"""
+        self.counts[status] = self.counts.get(status, 0) + 1
+        self.latency.append(time.monotonic() - start)
+        return status, nums, ()
+
+    async def _dispatch(self):
+        """take jobs off the queue and run them in the process pool"""
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            try:
+                now = time.monotonic()
+                if job.future.done() or now >= job.deadline:
+                    continue
+                self.waits.append(now - job.start)
+                self.busy += 1
+                try:
+                    result = await loop.run_in_executor(
+                        self.pool, solver._solve, job.nums,
+                        job.deadline - now)
+                finally:
+                    self.busy -= 1
+                if not job.future.done():
+                    job.future.set_result(result)
+            except Exception as err:
+                if not job.future.done():
+                    job.future.set_exception(err)
+            finally:
+                self.queue.task_done()
+
+    def metrics(self):
+        """dict of queue depth, counts, and latency (ms)"""
+        times = sorted(self.latency)
+        waits = sorted(self.waits)
+        return {"queued": self.queue.qsize() if self.queue else 0,
+                "maxqueue": self.maxqueue,
+                "busy": self.busy,
+                "workers": self.workers,
+                "requests": sum(self.counts.values()),
+                "counts": dict(self.counts),
+                "latency_ms": {"p50": percentile(times, 50) * 1000,
+                               "p95": percentile(times, 95) * 1000,
+                               "p99": percentile(times, 99) * 1000},
+                "queuewait_ms": {"p50": percentile(waits, 50) * 1000,
+                                 "p99": percentile(waits, 99) * 1000}}
+
+    async def _client(self, reader, writer):
+        """one connection: HTTP requests, or puzzle lines"""
+        try:
+            line = await reader.readline()
+            words = line.split()
+            if len(words) == 3 and words[2].startswith(b"HTTP/"):
+                while line:
+                    if not await self._http(line, reader, writer):
+                        break
+                    line = await reader.readline()
+            else:
+                while line:
+                    if line.strip():
+                        await self._line(line, writer)
+                    line = await reader.readline()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # (hung up, or not speaking HTTP properly: just close)
+            pass
+        finally:
+            writer.close()
+
+    async def _line(self, line, writer):
+        """line protocol: one puzzle line in, one solution line out"""
+        try:
+            nums = puzzleio.parse(line.decode("ascii", "replace"))
+        except ValueError:
+            nums = None
+        status, solution, _ = await self.solve(nums)
+        writer.write(("%s %s\n" % (puzzleio.tostring(solution), status))
+                     .encode("ascii"))
+        await writer.drain()
+
+    async def _http(self, requestline, reader, writer):
+        """answer one HTTP request, return True to keep the connection"""
+        method, target, version = requestline.decode("latin-1").split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAXBODY:
+            await self._respond(writer, 413, {"error": "too big"}, False)
+            return False
+        body = await reader.readexactly(length) if length else b""
+        keepalive = headers.get("connection", "").lower() != "close" \
+            and version == "HTTP/1.1"
+        url = urlsplit(target)
+        if method == "GET" and url.path == "/metrics":
+            code, reply = 200, self.metrics()
+        elif method == "POST" and url.path == "/solve":
+            code, reply = await self._httpsolve(body, parse_qs(url.query))
+        else:
+            code, reply = 404, {"error": "try POST /solve or GET /metrics"}
+        await self._respond(writer, code, reply, keepalive)
+        return keepalive
+
+    async def _httpsolve(self, body, query):
+        """POST /solve: return (HTTP code, reply dict)"""
+        text = body.decode("utf-8", "replace").strip()
+        budget = query.get("budget", [None])[0]
+        try:
+            if text.startswith("{"):
+                request = json.loads(text)
+                text = request.get("puzzle", "")
+                budget = request.get("budget", budget)
+            nums = puzzleio.parse(text)
+            if budget is not None:
+                budget = float(budget)
+                if not math.isfinite(budget) or budget <= 0:
+                    raise ValueError("budget must be a number of seconds "
+                                     "> 0, not %r" % budget)
+        except (ValueError, AttributeError, TypeError) as err:
+            return 400, {"error": str(err)}
+        start = time.monotonic()
+        status, solution, techniques = await self.solve(nums, budget)
+        reply = {"status": status,
+                 "ms": (time.monotonic() - start) * 1000}
+        if status == BUSY:
+            return 503, reply
+        if status == TIMEOUT:
+            return 504, reply
+        if status == solver.ERROR:
+            return 500, reply
+        reply["solution"] = puzzleio.tostring(solution)
+        reply["techniques"] = list(techniques)
+        return 200, reply
+
+    async def _respond(self, writer, code, reply, keepalive):
+        """write a JSON HTTP response"""
+        body = json.dumps(reply).encode("utf-8")
+        head = ["HTTP/1.1 %d %s" % (code, REASONS[code]),
+                "Content-Type: application/json",
+                "Content-Length: %d" % len(body),
+                "Connection: %s" % ("keep-alive" if keepalive else "close")]
+        if code == 503:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1")
+                     + body)
+        await writer.drain()
+
+
+async def _post(port, body, path="/solve"):
+    """tiny HTTP client for the tests: return (code, reply dict)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    method = "POST" if body is not None else "GET"
+    body = (body or "").encode("utf-8")
+    writer.write(("%s %s HTTP/1.1\r\nHost: localhost\r\n"
+                  "Content-Length: %d\r\nConnection: close\r\n\r\n"
+                  % (method, path, len(body))).encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+async def _tests():
+    """minimal tests, on localhost"""
+    shortz = "039500000000800070000010904100400003000000000007000860006708" \
+        "200010090005000001008"
+    service = SolveService(workers=2, maxqueue=4, budget=10.0)
+    await service.start(port=0)
+    port = service.getport()
+    code, reply = await _post(port, shortz)
+    print(code, reply)
+    assert code == 200 and reply["status"] == puzzle.SOLVED
+    code, reply = await _post(port, json.dumps({"puzzle": shortz}))
+    assert code == 200 and "0" not in reply["solution"]
+    code, reply = await _post(port, "not a puzzle")
+    assert code == 400
+    for budget in [[1], "nan", -1, 0, "inf"]:
+        code, reply = await _post(port, json.dumps({"puzzle": shortz,
+                                                    "budget": budget}))
+        assert code == 400, budget
+    code, reply = await _post(port, shortz, "/solve?budget=nan")
+    assert code == 400
+    # the line protocol
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((shortz + "\nnonsense\n").encode("ascii"))
+    first = await reader.readline()
+    second = await reader.readline()
+    writer.close()
+    assert first.split()[1] == puzzle.SOLVED.encode()
+    assert second.split()[1] == puzzle.INVALID.encode()
+    # tiny budget: 504; lots at once: some are turned away (503)
+    hard = "0" * 625
+    code, reply = await _post(port, json.dumps({"puzzle": hard,
+                                                "budget": 0.05}))
+    print(code, reply)
+    assert code == 504
+    replies = await asyncio.gather(*(service.solve(puzzleio.parse(hard), 0.5)
+                                     for _ in range(12)))
+    statuses = [status for status, _, _ in replies]
+    print(statuses)
+    assert BUSY in statuses
+    # a job the workers can't even be sent comes back as an error
+    status, _, _ = await service.solve(lambda: None)
+    assert status == solver.ERROR
+    code, reply = await _post(port, None, "/metrics")
+    print(code, reply)
+    assert code == 200 and reply["counts"][BUSY] >= 1
+    assert reply["counts"][solver.ERROR] == 1
+    await service.stop()
+    print("all ok")
+
+
+def main():
+    """serve on localhost (service.py port), or with no args run some
+    minimal tests"""
+    if len(sys.argv) == 2:
+        async def serve():
+            service = SolveService()
+            await service.start(port=int(sys.argv[1]))
+            print("serving on port", service.getport())
+            await service.server.serve_forever()
+        asyncio.run(serve())
+        return
+    asyncio.run(_tests())
+
+
+if __name__ == "__main__":
+    main()
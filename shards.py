@@ -0,0 +1,329 @@
+"""
+solve a huge corpus in shards, with checkpoints, so it can be resumed
+
+The input (a text file of puzzle lines, or a binary file from
+binio.py) is split into shards: byte ranges that start and end on
+line boundaries, or ranges of records.  Each shard is solved on its
+own, by one worker process, into its own output file, and after every
+batch of puzzles the worker writes a checkpoint: how far into the
+input it got, and how much of its output goes with that.  Checkpoints
+are written to a temp file and renamed over the old one, so they are
+always whole.  A worker holds a lock on its shard (flock on
+shard-NNNNN.lock) the whole time, so two runs never work on the same
+shard at once: a resumed run waits for a worker left over from a
+killed one (which stops after its batch) and then carries on from
+that worker's last checkpoint.
+
+Run it again after a crash (same command) and every shard picks up
+from its last checkpoint: output written after it is cut off, and
+nothing is solved twice.  When all the shards are done, their outputs
+are put together, in order, into the output file (same format as
+puzzleio.py: "solution status" lines).
+
+    python3 shards.py puzzles.txt solutions.txt --shards 64
+
+Work files go in solutions.txt.shards/ (see --workdir).
+
+Oct 2026
+"""
+
+import argparse
+import fcntl
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import binio
+import puzzle
+import puzzleio
+import solver
+
+PLANFILE = "plan.json"
+
+
+def _isbinary(path):
+    """True if path is a binio.py file"""
+    with open(path, "rb") as infile:
+        return infile.read(len(binio.MAGIC)) == binio.MAGIC
+
+
+def plan(path, nshards):
+    """split path into at most nshards (start, stop) ranges: byte
+    offsets on line boundaries for text, record numbers for binary"""
+    if _isbinary(path):
+        total = len(binio.PuzzleFile(path))
+        cuts = [total * k // nshards for k in range(nshards + 1)]
+    else:
+        total = os.path.getsize(path)
+        cuts = [0]
+        with open(path, "rb") as infile:
+            for k in range(1, nshards):
+                # (move each cut to the start of the next line)
+                infile.seek(max(total * k // nshards - 1, 0))
+                infile.readline()
+                cuts.append(min(infile.tell(), total))
+        cuts.append(total)
+    return [(start, stop) for start, stop in zip(cuts, cuts[1:])
+            if start < stop]
+
+
+def _writejson(path, data):
+    """write data to path, all or nothing (temp file, then rename)"""
+    tmppath = path + ".tmp"
+    with open(tmppath, "w") as outfile:
+        json.dump(data, outfile)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    os.replace(tmppath, path)
+
+
+def _readjson(path):
+    """the data in path, or None if it isn't there"""
+    try:
+        with open(path) as infile:
+            return json.load(infile)
+    except FileNotFoundError:
+        return None
+
+
+def _shardpath(workdir, index, ext):
+    """name of a shard's output (ext "txt"), checkpoint ("json") or
+    lock ("lock")"""
+    return os.path.join(workdir, "shard-%05d.%s" % (index, ext))
+
+
+def _readbatch(infile, offset, stop, batchsize, binary):
+    """up to batchsize puzzles from offset, return (puzzles, new offset)"""
+    if binary:
+        end = min(offset + batchsize, stop)
+        return list(infile.nums(offset, end)), end
+    puzzles = []
+    infile.seek(offset)
+    while offset < stop and len(puzzles) < batchsize:
+        line = infile.readline()
+        if not line:
+            break
+        offset += len(line)
+        puzzles.extend(puzzleio.readpuzzles([line.decode("ascii",
+                                                         "replace")]))
+    return puzzles, offset
+
+
+def _runshard(args):
+    """worker: solve one shard, from its checkpoint on, and return
+    [(shard index, status counts)] (waits for the shard's lock first)"""
+    path, workdir, index, start, stop, batchsize, maxbatches, runner = args
+    with open(_shardpath(workdir, index, "lock"), "w") as lockfile:
+        fcntl.flock(lockfile, fcntl.LOCK_EX)
+        try:
+            return _solveshard(path, workdir, index, start, stop,
+                               batchsize, maxbatches, runner)
+        finally:
+            fcntl.flock(lockfile, fcntl.LOCK_UN)
+
+
+def _solveshard(path, workdir, index, start, stop, batchsize, maxbatches,
+                runner):
+    """_runshard, once it has the lock"""
+    binary = _isbinary(path)
+    checkpath = _shardpath(workdir, index, "json")
+    check = _readjson(checkpath)
+    if check is None:
+        check = {"start": start, "stop": stop, "offset": start,
+                 "outsize": 0, "count": 0, "statuses": {}, "done": False}
+    if check["done"]:
+        return [(index, check["statuses"])]
+    infile = binio.PuzzleFile(path) if binary else open(path, "rb")
+    outfile = open(_shardpath(workdir, index, "txt"), "ab")
+    # (anything past the checkpoint is from a run that didn't finish)
+    outfile.truncate(check["outsize"])
+    statuses = check["statuses"]
+    batches = 0
+    while check["offset"] < stop:
+        if maxbatches is not None and batches >= maxbatches:
+            break
+        if os.getppid() != runner and os.getpid() != runner:
+            # (the run was killed: stop, and let go of the lock, so a
+            # resumed run can have this shard)
+            break
+        puzzles, offset = _readbatch(infile, check["offset"], stop,
+                                     batchsize, binary)
+        lines = []
+        for nums in puzzles:
+            status, solution, _ = solver._solve(nums)
+            lines.append("%s %s\n" % (puzzleio.tostring(solution), status))
+            statuses[status] = statuses.get(status, 0) + 1
+        outfile.write("".join(lines).encode("ascii"))
+        outfile.flush()
+        os.fsync(outfile.fileno())
+        check["offset"] = offset
+        check["outsize"] = outfile.tell()
+        check["count"] += len(puzzles)
+        check["done"] = offset >= stop
+        _writejson(checkpath, check)
+        batches += 1
+    if check["offset"] >= stop and not check["done"]:
+        # (an empty last bit of input: nothing to solve, still done)
+        check["done"] = True
+        _writejson(checkpath, check)
+    outfile.close()
+    if not binary:
+        infile.close()
+    return [(index, statuses)]
+
+
+def run(path, outpath, nshards=16, workdir=None, workers=None,
+        batchsize=1000, maxbatches=None):
+    """solve every puzzle in path into outpath, in shards (see the top
+    of this file), return a dict of status -> count
+
+    The shards are picked on the first run and saved in workdir (by
+    default, outpath + ".shards"), and a later run with the same
+    workdir carries on from the checkpoints.  outpath is only written
+    once every shard is done.  (maxbatches stops each shard after
+    that many batches, as if it had crashed: for testing.)
+    """
+    if workdir is None:
+        workdir = outpath + ".shards"
+    os.makedirs(workdir, exist_ok=True)
+    planpath = os.path.join(workdir, PLANFILE)
+    saved = _readjson(planpath)
+    insize = os.path.getsize(path)
+    if saved is None:
+        saved = {"input": os.path.abspath(path), "size": insize,
+                 "shards": plan(path, nshards)}
+        _writejson(planpath, saved)
+    elif saved["size"] != insize:
+        raise ValueError("%s has changed since %s was made"
+                         % (path, workdir))
+    shards = saved["shards"]
+    jobs = ([(path, workdir, index, start, stop, batchsize, maxbatches,
+              os.getpid())]
+            for index, (start, stop) in enumerate(shards))
+    # (one shard per chunk: shards are big enough to keep a worker busy)
+    counts = {}
+    for _, statuses in solver._mapchunks(_runjobs, jobs, workers,
+                                         ordered=False):
+        for status, count in statuses.items():
+            counts[status] = counts.get(status, 0) + count
+    checks = [_readjson(_shardpath(workdir, index, "json"))
+              for index in range(len(shards))]
+    if all(check is not None and check["done"] for check in checks):
+        merge(workdir, len(shards), outpath)
+    return counts
+
+
+def _runjobs(jobs):
+    """worker: run a list of shard jobs"""
+    results = []
+    for job in jobs:
+        results.extend(_runshard(job))
+    return results
+
+
+def merge(workdir, nshards, outpath):
+    """put the shard outputs together, in order, into outpath (all or
+    nothing: a temp file, then rename)"""
+    tmppath = outpath + ".tmp"
+    with open(tmppath, "wb") as outfile:
+        for index in range(nshards):
+            check = _readjson(_shardpath(workdir, index, "json"))
+            with open(_shardpath(workdir, index, "txt"), "rb") as infile:
+                # (only the checkpointed part of each shard)
+                remaining = check["outsize"]
+                while remaining > 0:
+                    block = infile.read(min(remaining, 1 << 20))
+                    if not block:
+                        break
+                    outfile.write(block)
+                    remaining -= len(block)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    os.replace(tmppath, outpath)
+
+
+def _tests():
+    """minimal tests, including a crash and a resume"""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "corpus", "pss.txt")) as infile:
+        text = infile.read()
+    text += "not a puzzle\n\n" + text[:200]
+    expected = io.StringIO()
+    puzzleio.solvefile(io.StringIO(text), expected, workers=1)
+    expected = expected.getvalue()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "puzzles.txt")
+        with open(path, "w") as outfile:
+            outfile.write(text)
+        shards = plan(path, 5)
+        print(shards)
+        assert len(shards) == 5 and shards[0][0] == 0
+        assert shards[-1][1] == len(text)
+        for start, _ in shards:
+            assert start == 0 or text[start - 1] == "\n"
+        outpath = os.path.join(tmpdir, "solutions.txt")
+        # crash after one batch of 3 in every shard
+        counts = run(path, outpath, 5, workers=2, batchsize=3, maxbatches=1)
+        assert sum(counts.values()) == 15 and not os.path.exists(outpath)
+        # (and junk after a checkpoint, from a write that didn't finish)
+        with open(_shardpath(outpath + ".shards", 0, "txt"), "a") as junk:
+            junk.write("half a li")
+        # (a worker from the crashed run still has shard 0: wait for it)
+        lockpath = _shardpath(outpath + ".shards", 0, "lock")
+        with open(lockpath, "w") as lockfile:
+            fcntl.flock(lockfile, fcntl.LOCK_EX)
+            timer = threading.Timer(0.5, fcntl.flock,
+                                    [lockfile, fcntl.LOCK_UN])
+            timer.start()
+            started = time.monotonic()
+            counts = run(path, outpath, 99, workers=2, batchsize=3)
+            assert time.monotonic() - started >= 0.5
+            timer.join()
+        print(counts)
+        with open(outpath) as infile:
+            assert infile.read() == expected
+        assert sum(counts.values()) == len(expected.splitlines())
+        assert counts[puzzle.INVALID] == expected.count(puzzle.INVALID)
+        # binary input: record ranges
+        binpath = os.path.join(tmpdir, "puzzles.bin")
+        count = binio.fromtext(io.StringIO(text), binpath)
+        assert plan(binpath, 4)[-1] == (count * 3 // 4, count)
+        outpath = os.path.join(tmpdir, "binsolutions.txt")
+        run(binpath, outpath, 4, workers=1, batchsize=7)
+        with open(outpath) as infile:
+            good = [line for line in expected.splitlines()
+                    if not line.endswith(puzzle.INVALID)]
+            assert infile.read().splitlines() == good
+    print("all ok")
+
+
+def main():
+    """shards.py infile outfile (see the top of this file), or with no
+    args run some minimal tests"""
+    if len(sys.argv) == 1:
+        _tests()
+        return
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("infile", help="puzzle lines, or a binio.py file")
+    parser.add_argument("outfile", help="where the solution lines go")
+    parser.add_argument("--shards", type=int, default=16,
+                        help="how many pieces to split infile into "
+                        "(first run only)")
+    parser.add_argument("--workdir",
+                        help="checkpoints and shard outputs "
+                        "(default: outfile.shards)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--batchsize", type=int, default=1000,
+                        help="puzzles between checkpoints")
+    args = parser.parse_args()
+    counts = run(args.infile, args.outfile, args.shards, args.workdir,
+                 args.workers, args.batchsize)
+    print(counts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+solve lots of sudoku puzzles, spread over worker processes
+
+Each worker runs the whole Puzzle algorithm (findforced, mark, then
+findpss/filtermarkups until done) with printing turned off.  Puzzles
+are sent to the workers in chunks, so each trip between processes
+carries many puzzles.
+
+Oct 2026
+"""
+
+import multiprocessing
+import os
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+import numpy as np
+import puzzle
+from bitset import tonums
+from units import orderof
+
+# status for a puzzle the solver raised an exception on (a bug, but
+# it shouldn't take the rest of a batch down with it)
+ERROR = "error"
+
+# index is the puzzle's position in the input, techniques is a
+# tuple like ("forced", "pss") from Puzzle.gettechniques()
+Result = namedtuple("Result", ["index", "status", "solution", "techniques"],
+                    defaults=[()])
+
+
+def solve(nums):
+    """solve one puzzle (9x9 nums, or 16x16, ...), return (status,
+    solution np.array)"""
+    status, solution, _ = _solve(nums)
+    return status, solution
+
+
+def _boardorder(nums):
+    """board order of nums (an np.array), or 0 if it can't be a puzzle"""
+    order = orderof(nums.shape[0]) if nums.ndim == 2 else 0
+    if not order or nums.shape[0] != nums.shape[1] or nums.min() < 0 \
+            or nums.max() > nums.shape[0]:
+        return 0
+    return order
+
+
+def _puzzle(nums):
+    """a Puzzle set up with nums, or None if nums can't be a puzzle"""
+    nums = np.asarray(nums)
+    order = _boardorder(nums)
+    if not order:
+        return None
+    puzz = puzzle.Puzzle(order=order)
+    puzz.setnums(nums)
+    return puzz
+
+
+def _solve(nums, timeout=None):
+    """solve one puzzle, return (status, solution, techniques)
+
+    with a timeout (seconds), search gives up (STALLED) when it runs out,
+    and if anything goes wrong the status is ERROR
+    """
+    try:
+        puzz = _puzzle(nums)
+        if puzz is None:
+            return puzzle.INVALID, np.asarray(nums), ()
+        status = puzz.solve(timeout=timeout)
+        return status, puzz.getnums(), puzz.gettechniques()
+    except Exception:
+        return ERROR, np.asarray(nums), ()
+
+
+def count_solutions(nums, limit=2, maxnodes=10000, timeout=None):
+    """how many solutions nums has, stopping at limit (so with the
+    default, 0 means none, 1 unique, and 2 more than one), or None if
+    it ran out of nodes or time first (see Puzzle.countsolutions)"""
+    puzz = _puzzle(nums)
+    if puzz is None:
+        return 0
+    return puzz.countsolutions(limit, maxnodes, timeout)
+
+
+def solve_parallel(nums, workers=None, maxnodes=10000, timeout=None):
+    """solve one hard puzzle on several cpus, return (status, solution,
+    techniques)
+
+    Up to the first stall this is Puzzle.solve.  Then the numbers in
+    the best cell's markup (and, while there are more workers than
+    that, the best cells of those branches) each go to a worker
+    process, which runs search on just that branch.  The first branch
+    to solve it wins, and the others are stopped.  maxnodes is for
+    each branch, timeout (seconds) for the whole thing.
+    """
+    puzz = _puzzle(nums)
+    if puzz is None:
+        return puzzle.INVALID, np.asarray(nums), ()
+    deadline = None
+    if timeout is not None:
+        deadline = time.monotonic() + timeout
+    status = puzz.solve(search=False)
+    if status != puzzle.STALLED:
+        return status, puzz.getnums(), puzz.gettechniques()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    techniques = set(puzz.techniques) | {"search"}
+    # (puzz is left on one of the branches, so its techniques are
+    # not the whole story from here on)
+    solution, states = _branches(puzz, workers)
+    if solution is not None:
+        # (solved while splitting it up)
+        return puzzle.SOLVED, solution, tuple(sorted(techniques))
+    if not states:
+        return puzzle.INVALID, np.array(nums), tuple(sorted(techniques))
+    jobs = [(puzz.order, state, maxnodes, deadline) for state in states]
+    status = puzzle.INVALID
+    with multiprocessing.Pool(min(workers, len(jobs))) as pool:
+        # (leaving the with terminates the workers still searching)
+        for result in pool.imap_unordered(_searchbranch, jobs):
+            if result[0] == puzzle.SOLVED:
+                return (puzzle.SOLVED, result[1],
+                        tuple(sorted(techniques | set(result[2]))))
+            if result[0] == puzzle.STALLED:
+                status = puzzle.STALLED
+    return status, np.array(nums), tuple(sorted(techniques))
+
+
+def _branches(puzz, count):
+    """split a stalled puzzle into at least count stalled branches
+    (fewer if that's all there are), and return (solution, states):
+    the solution if one turns up on the way (else None), and the
+    branches' states (see Puzzle.getstate)"""
+    states = deque([puzz.getstate()])
+    while states and len(states) < count:
+        puzz.setstate(states.popleft())
+        i = puzz._bestcell()
+        snap = puzz.snapshot()
+        for num in tonums(puzz.cands[i]):
+            puzz._place(i, num, "search")
+            status = puzz._runpss()
+            if status == puzzle.SOLVED:
+                return puzz.getnums(), []
+            if status == puzzle.STALLED:
+                states.append(puzz.getstate())
+            puzz.restore(snap)
+        puzz.droptrail()
+    return None, list(states)
+
+
+def _searchbranch(job):
+    """worker: search one branch, return (status, solution, techniques)"""
+    order, state, maxnodes, deadline = job
+    puzz = puzzle.Puzzle(order=order)
+    puzz.setstate(state)
+    timeout = None
+    if deadline is not None:
+        timeout = deadline - time.monotonic()
+    status = puzz.search(maxnodes, timeout)
+    return status, puzz.getnums(), puzz.gettechniques()
+
+
+def _solvechunk(chunk):
+    """worker: solve a list of (index, nums), return list of Results"""
+    results = []
+    for index, nums in chunk:
+        results.append(Result(index, *_solve(nums)))
+    return results
+
+
+def _chunks(puzzles, chunksize):
+    """split any iterable of puzzles into lists of (index, nums)"""
+    numbered = enumerate(puzzles)
+    while True:
+        chunk = list(islice(numbered, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_many(puzzles, workers=None, chunksize=32, ordered=True):
+    """solve an iterable of puzzles, yielding a Result for each one
+
+    workers is the number of processes (default: one per cpu, and
+    workers=1 solves in this process).  With ordered=True results come
+    back in input order, otherwise in the order they finish.  Only a
+    few chunks per worker are read ahead, so puzzles can be a generator
+    over a huge input.
+    """
+    return _mapchunks(_solvechunk, _chunks(puzzles, chunksize), workers,
+                      ordered)
+
+
+def _mapchunks(func, chunks, workers=None, ordered=True):
+    """yield everything in func(chunk) for each chunk, run in worker
+    processes (see solve_many), with only 2 chunks per worker at a time
+    sent off"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            yield from func(chunk)
+        return
+    maxinflight = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if ordered:
+            inflight = deque()
+            for chunk in chunks:
+                inflight.append(pool.submit(func, chunk))
+                if len(inflight) >= maxinflight:
+                    yield from inflight.popleft().result()
+            while inflight:
+                yield from inflight.popleft().result()
+        else:
+            inflight = set()
+            for chunk in chunks:
+                inflight.add(pool.submit(func, chunk))
+                if len(inflight) >= maxinflight:
+                    done, inflight = wait(inflight,
+                                          return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            for future in inflight:
+                yield from future.result()
+
+
+def main():
+    """minimal tests for solve_many"""
+    shortz = np.array([[0, 3, 9, 5, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 8, 0, 0, 0, 7, 0],
+                       [0, 0, 0, 0, 1, 0, 9, 0, 4],
+                       [1, 0, 0, 4, 0, 0, 0, 0, 3],
+                       [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 7, 0, 0, 0, 8, 6, 0],
+                       [0, 0, 6, 7, 0, 8, 2, 0, 0],
+                       [0, 1, 0, 0, 9, 0, 0, 0, 5],
+                       [0, 0, 0, 0, 0, 1, 0, 0, 8]])
+    bad = shortz.copy()
+    bad[0, 0] = 3
+    small = np.array([[1, 0, 0, 4], [0, 0, 1, 0], [2, 1, 0, 0], [4, 0, 0, 1]])
+    puzzles = [shortz, shortz.T, bad, np.zeros((9, 9), dtype=int),
+               small] * 4
+    results = list(solve_many(puzzles, workers=2, chunksize=3))
+    assert [r.index for r in results] == list(range(len(puzzles)))
+    for result in results[:5]:
+        print(result.index, result.status, result.techniques)
+    assert results[0].status == puzzle.SOLVED
+    assert (results[1].solution == results[0].solution.T).all()
+    assert results[2].status == puzzle.INVALID
+    # nothing to go on, so this one is all search
+    assert results[3].status == puzzle.SOLVED
+    assert results[4].status == puzzle.SOLVED
+    assert results[4].solution.shape == (4, 4)
+    # one puzzle that breaks the solver doesn't lose the others
+    junk = np.full((9, 9), "1")
+    for workers in (1, 2):
+        results = list(solve_many([shortz, junk, small], workers=workers))
+        assert [r.status for r in results] == [puzzle.SOLVED, ERROR,
+                                               puzzle.SOLVED]
+    assert count_solutions(shortz) == 1
+    assert count_solutions(bad) == 0
+    assert count_solutions(np.zeros((9, 9), dtype=int), limit=5) == 5
+    # (an empty 16x16 has far too many to count in 3 nodes)
+    assert count_solutions(np.zeros((16, 16), dtype=int), limit=10**6,
+                           maxnodes=3) is None
+    # hard ones, searched on 2 cpus
+    for nums in (shortz, np.zeros((9, 9), dtype=int), bad,
+                 np.zeros((16, 16), dtype=int)):
+        status, solution, techniques = solve_parallel(nums, workers=2)
+        print(status, techniques)
+        if nums is bad:
+            assert status == puzzle.INVALID
+        else:
+            assert status == puzzle.SOLVED and count_solutions(solution) == 1
+            assert ((nums == 0) | (nums == solution)).all()
+    # order 6: more guesses in a row than python allows recursive calls
+    big = np.zeros((36, 36), dtype=int)
+    status, solution = solve(big)
+    assert status == puzzle.SOLVED and count_solutions(solution) == 1
+    assert count_solutions(big, maxnodes=5000) == 2
+    # (no nodes: every branch gives up, but the split was a search)
+    status, solution, techniques = solve_parallel(
+        np.zeros((16, 16), dtype=int), workers=2, maxnodes=0)
+    assert status == puzzle.STALLED and techniques == ("search",)
+    assert not solution.any()
+    unordered = list(solve_many(puzzles, workers=2, chunksize=3,
+                                ordered=False))
+    assert sorted(r.index for r in unordered) == list(range(len(puzzles)))
+    print("all ok")
+
+
+if __name__ == "__main__":
+    main()
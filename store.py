@@ -0,0 +1,170 @@
+"""
+on-disk store of solved puzzles (sqlite3)
+
+Maps the 81-character givens string (0 for blanks, see puzzleio.py)
+to the solution, the status, and the techniques used.  Lookups and
+inserts are done in batches, one transaction each, so a long corpus
+run can be restarted and skip everything it already solved.
+
+Oct 2026
+"""
+
+import io
+import sqlite3
+import sys
+from itertools import islice
+
+import numpy as np
+import puzzleio
+import solver
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    givens TEXT PRIMARY KEY,
+    solution TEXT NOT NULL,
+    status TEXT NOT NULL,
+    techniques TEXT NOT NULL DEFAULT ''
+)
+"""
+# sqlite has a limit on the number of ? in one statement
+MAXVARS = 500
+
+
+class SolutionStore():
+    """sqlite-backed map of givens string -> (solution, status, techniques)"""
+
+    def __init__(self, path=":memory:"):
+        """open (or create) the store in file path"""
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute(SCHEMA)
+
+    def __repr__(self):
+        """every class should have a repr"""
+        return "%s(%r)" % (self.__class__.__name__, self.path)
+
+    def __len__(self):
+        query = "SELECT COUNT(*) FROM solutions"
+        return self.conn.execute(query).fetchone()[0]
+
+    def close(self):
+        """close the database"""
+        self.conn.close()
+
+    def lookup(self, givens):
+        """return (solution, status, techniques) for givens, or None"""
+        return self.lookupmany([givens]).get(givens)
+
+    def lookupmany(self, givenslist):
+        """return dict of givens -> (solution, status, techniques) for
+        all the givens strings that are in the store"""
+        givenslist = list(givenslist)
+        found = {}
+        for start in range(0, len(givenslist), MAXVARS):
+            batch = givenslist[start:start + MAXVARS]
+            query = "SELECT givens, solution, status, techniques " \
+                "FROM solutions WHERE givens IN (%s)" \
+                % ",".join("?" * len(batch))
+            for givens, solution, status, techniques in \
+                    self.conn.execute(query, batch):
+                found[givens] = (solution, status, techniques)
+        return found
+
+    def putmany(self, rows):
+        """add (givens, solution, status, techniques) rows, in one
+        transaction, and return how many were added"""
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)", rows)
+        return cursor.rowcount
+
+    def prewarm(self, puzzlefile, solutionfile, batchsize=10000):
+        """load puzzles and matching solution lines (as written by
+        puzzleio.solvefile) into the store, return how many were added"""
+        puzzles = (line.strip() for line in puzzlefile
+                   if line.strip() and not line.startswith("#"))
+        pairs = zip(puzzles, solutionfile)
+        count = 0
+        while True:
+            rows = []
+            for givens, line in islice(pairs, batchsize):
+                solution, status = line.split()[:2]
+                rows.append((givens.replace(".", "0"), solution, status, ""))
+            if not rows:
+                return count
+            count += self.putmany(rows)
+
+    def solve_many(self, puzzles, batchsize=1000, **kwargs):
+        """like solver.solve_many (results in input order), but look up
+        each batch of puzzles in the store first, and only solve (and
+        then store) the ones that aren't there"""
+        numbered = enumerate(puzzles)
+        while True:
+            batch = list(islice(numbered, batchsize))
+            if not batch:
+                return
+            # (lines that weren't puzzles have no key: never stored)
+            keys = [puzzleio.tostring(nums) if np.shape(nums) == (9, 9)
+                    else None for _, nums in batch]
+            found = self.lookupmany(key for key in keys if key)
+            misses = [(index, nums, key)
+                      for (index, nums), key in zip(batch, keys)
+                      if key not in found]
+            solved = {}
+            rows = []
+            for (index, nums, key), result in zip(
+                    misses, solver.solve_many([nums for _, nums, _ in misses],
+                                              ordered=True, **kwargs)):
+                solved[index] = result._replace(index=index)
+                # (an ERROR might not happen next time: don't keep it)
+                if key and result.status != solver.ERROR:
+                    rows.append((key,
+                                 puzzleio.tostring(result.solution),
+                                 result.status, ",".join(result.techniques)))
+            self.putmany(rows)
+            for (index, nums), key in zip(batch, keys):
+                if index in solved:
+                    yield solved[index]
+                else:
+                    solution, status, techniques = found[key]
+                    yield solver.Result(index, status,
+                                        puzzleio.parse(solution),
+                                        tuple(filter(None,
+                                                     techniques.split(","))))
+
+
+def main():
+    """store.py puzzles.txt solutions.txt store.db: prewarm a store from a
+    solved file, or with no args run some minimal tests"""
+    if len(sys.argv) == 4:
+        store = SolutionStore(sys.argv[3])
+        with open(sys.argv[1]) as puzzles, open(sys.argv[2]) as solutions:
+            print("added", store.prewarm(puzzles, solutions))
+        store.close()
+        return
+    shortz = puzzleio.parse("0395000000008000700000109041004000030000"
+                            "00000007000860006708200010090005000001008")
+    puzzles = [shortz, shortz.T, None, shortz]
+    store = SolutionStore()
+    first = list(store.solve_many(puzzles, workers=1))
+    print(first[0])
+    assert len(store) == 2
+    second = list(store.solve_many(puzzles, workers=1))
+    for a, b in zip(first, second):
+        assert a.index == b.index and a.status == b.status
+        assert a.techniques == b.techniques
+    assert (first[1].solution == second[1].solution).all()
+    assert second[2].status == "invalid"
+    print(store.lookup(puzzleio.tostring(shortz)))
+    # prewarm from a puzzle file and its solutions
+    text = puzzleio.tostring(shortz.T[::-1]) + "\n"
+    out = io.StringIO()
+    puzzleio.solvefile(io.StringIO(text), out, workers=1)
+    added = store.prewarm(io.StringIO(text), io.StringIO(out.getvalue()))
+    assert added == 1 and len(store) == 3
+    print("all ok")
+
+
+if __name__ == "__main__":
+    main()
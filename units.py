@@ -0,0 +1,129 @@
+"""
+row, column and box index tables for a sudoku puzzle
+
+Cells are numbered 0-80 in row-major order (index = row*9 + col).
+Units are numbered 0-26: rows 0-8, then cols 9-17, then boxes 18-26.
+Everything here is built once, at import time.
+
+Bigger boards work the same way: a board of order k has k*k boxes of
+k*k cells, so size = k*k numbers, size*size cells, and 3*size units.
+tables(order) builds (and remembers) the same tables for any order;
+the module-level names are the ones for 9x9 (order 3).
+
+Oct 2026
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# biggest board order supported (49x49: 49 numbers fit in a uint64
+# mask, and there are enough symbols to print them, see bitset.py)
+MAXORDER = 7
+
+Tables = namedtuple("Tables", ["order", "size", "ncells",
+                               "rowof", "colof", "boxof",
+                               "rows", "cols", "boxes",
+                               "units", "unittypes", "cellunits", "peers",
+                               "unitindex", "peerindex", "cellunitindex"])
+
+
+@lru_cache(maxsize=None)
+def tables(order=3):
+    """all the index tables for a board of this order (3 is 9x9)"""
+    if not 2 <= order <= MAXORDER:
+        raise ValueError("board order should be 2-%d" % MAXORDER)
+    size = order * order
+    ncells = size * size
+    rowof = tuple(i // size for i in range(ncells))
+    colof = tuple(i % size for i in range(ncells))
+    boxof = tuple((rowof[i] // order) * order + colof[i] // order
+                  for i in range(ncells))
+
+    rows = tuple(tuple(range(row*size, row*size + size))
+                 for row in range(size))
+    cols = tuple(tuple(range(col, ncells, size)) for col in range(size))
+    boxes = tuple(tuple(i for i in range(ncells) if boxof[i] == box)
+                  for box in range(size))
+
+    units = rows + cols + boxes
+    unittypes = ("row",) * size + ("col",) * size + ("box",) * size
+    # (row unit, col unit, box unit) for each cell
+    cellunits = tuple((rowof[i], size + colof[i], 2*size + boxof[i])
+                      for i in range(ncells))
+    # the other cells that share a row, col, or box with each cell
+    peers = tuple(tuple(sorted(set(rows[rowof[i]] + cols[colof[i]]
+                                   + boxes[boxof[i]]) - {i}))
+                  for i in range(ncells))
+    return Tables(order, size, ncells, rowof, colof, boxof,
+                  rows, cols, boxes, units, unittypes, cellunits, peers,
+                  np.array(units, dtype=np.intp),
+                  np.array(peers, dtype=np.intp),
+                  np.array(cellunits, dtype=np.intp))
+
+
+_NINE = tables(3)
+
+ROWOF = _NINE.rowof
+COLOF = _NINE.colof
+BOXOF = _NINE.boxof
+
+ROWS = _NINE.rows
+COLS = _NINE.cols
+BOXES = _NINE.boxes
+
+UNITS = _NINE.units
+UNITTYPES = _NINE.unittypes
+
+# (row unit, col unit, box unit) for each cell
+CELLUNITS = _NINE.cellunits
+
+# the 20 other cells that share a row, col, or box with each cell
+PEERS = _NINE.peers
+
+# same tables as np.arrays, for fancy indexing: (27, 9), (81, 20),
+# and (81, 3)
+UNITINDEX = _NINE.unitindex
+PEERINDEX = _NINE.peerindex
+CELLUNITINDEX = _NINE.cellunitindex
+
+
+def orderof(size):
+    """board order for a size x size board (4 -> 2, 9 -> 3, 16 -> 4),
+    or 0 if there isn't one"""
+    order = int(round(size ** 0.5))
+    if order * order != size or not 2 <= order <= MAXORDER:
+        return 0
+    return order
+
+
+def index(row, col, size=9):
+    """cell index for row, col"""
+    return row*size + col
+
+
+def main():
+    """minimal tests for the unit tables"""
+    assert len(UNITS) == 27
+    assert all(len(unit) == 9 for unit in UNITS)
+    assert all(len(peers) == 20 for peers in PEERS)
+    assert BOXES[4] == (30, 31, 32, 39, 40, 41, 48, 49, 50)
+    assert CELLUNITS[index(4, 7)] == (4, 16, 23)
+    for i in range(81):
+        for unit in CELLUNITS[i]:
+            assert i in UNITS[unit]
+    print("box 0:", BOXES[0])
+    print("peers of (0,0):", PEERS[0])
+    big = tables(4)
+    assert big.unitindex.shape == (48, 16)
+    assert big.peerindex.shape == (256, 39)
+    assert big.boxes[5] == tuple(index(r, c, 16) for r in range(4, 8)
+                                 for c in range(4, 8))
+    assert tables(4) is big
+    assert orderof(25) == 5 and orderof(10) == 0
+    print("all ok")
+
+
+if __name__ == "__main__":
+    main()